@@ -0,0 +1,214 @@
+"""Almacén local persistente (SQLite) con carga incremental de archivos diarios.
+
+Uso:
+    python almacen.py indicadores.db archivo1.xlsx archivo2.csv ...
+
+Los registros se deduplican por (equipo, Hora de inicio). Junto a los registros se mantiene
+un cubo de horas por (fecha, frente, equipo, GOP, operación) que se actualiza solo con las
+filas nuevas de cada carga, así que consultar un mes no depende de cuánta historia haya.
+"""
+import os
+import sqlite3
+import sys
+from contextlib import closing
+from datetime import datetime
+
+import pandas as pd
+
+import calculos
+import ingesta
+
+# Ruta del archivo SQLite; si no se define, el dashboard no usa almacén
+RUTA_ALMACEN = os.environ.get("INDICADORES_ALMACEN")
+
+ESQUEMA = """
+CREATE TABLE IF NOT EXISTS registros (
+    fecha TEXT NOT NULL,
+    frente TEXT NOT NULL,
+    grupo_equipos TEXT,
+    equipo TEXT NOT NULL,
+    grupo_operaciones TEXT,
+    gop TEXT,
+    operacion TEXT,
+    inicio INTEGER NOT NULL,
+    fin INTEGER,
+    duracion_h REAL,
+    PRIMARY KEY (equipo, inicio)
+);
+CREATE INDEX IF NOT EXISTS ix_registros_fecha_frente ON registros (fecha, frente);
+
+-- GOP y operación nulos se guardan como '' para que formen parte de la clave
+CREATE TABLE IF NOT EXISTS cubo (
+    fecha TEXT NOT NULL,
+    frente TEXT NOT NULL,
+    equipo TEXT NOT NULL,
+    gop TEXT NOT NULL,
+    operacion TEXT NOT NULL,
+    horas REAL NOT NULL,
+    registros INTEGER NOT NULL,
+    PRIMARY KEY (fecha, frente, equipo, gop, operacion)
+);
+
+CREATE TABLE IF NOT EXISTS archivos (
+    huella TEXT PRIMARY KEY,
+    nombre TEXT,
+    cargado TEXT,
+    filas INTEGER,
+    filas_nuevas INTEGER
+);
+"""
+
+COLUMNAS_REGISTROS = [
+    "fecha", "frente", "grupo_equipos", "equipo", "grupo_operaciones", "gop", "operacion",
+    "inicio", "fin", "duracion_h",
+]
+
+
+def _a_registros(df):
+    """Filas del DataFrame normalizado con el formato de la tabla 'registros'.
+
+    Las filas sin equipo o sin hora de inicio se descartan: no se pueden deduplicar.
+    """
+    df = df[df[calculos.EQUIPO].notna() & df["Hora de inicio"].notna()]
+
+    def texto(col):
+        return df[col].astype(object).where(df[col].notna(), None)
+
+    return pd.DataFrame({
+        "fecha": df["Hora de inicio"].dt.strftime("%Y-%m-%d"),
+        "frente": texto(calculos.FRENTE),
+        "grupo_equipos": texto("Descripción del grupo de equipos"),
+        "equipo": df[calculos.EQUIPO].astype(str),
+        "grupo_operaciones": texto("Descripción del grupo de operaciones"),
+        "gop": texto(calculos.GOP),
+        "operacion": texto(calculos.OPERACION),
+        # Clave de deduplicación: siempre en nanosegundos, sea cual sea la unidad de origen
+        "inicio": df["Hora de inicio"].dt.as_unit("ns").astype("int64"),
+        "fin": df["Hora de finalización"].dt.as_unit("ns").astype("int64").where(df["Hora de finalización"].notna(), None),
+        "duracion_h": df["Duracion_h"].astype("float64"),
+    })[COLUMNAS_REGISTROS]
+
+
+class Almacen:
+    """Acceso al archivo SQLite; cada operación abre su propia conexión (seguro entre hilos)."""
+
+    def __init__(self, ruta=RUTA_ALMACEN):
+        self.ruta = ruta
+        with closing(self._conectar()) as con:
+            con.execute("PRAGMA journal_mode=WAL")
+            con.executescript(ESQUEMA)
+
+    def _conectar(self):
+        return sqlite3.connect(self.ruta, timeout=30)
+
+    def contiene(self, huella):
+        with closing(self._conectar()) as con:
+            return con.execute("SELECT 1 FROM archivos WHERE huella = ?", (huella,)).fetchone() is not None
+
+    def version(self):
+        """Cambia cada vez que se agrega un archivo; sirve como parte de las claves de caché."""
+        with closing(self._conectar()) as con:
+            return con.execute("SELECT COUNT(*), COALESCE(MAX(cargado), '') FROM archivos").fetchone()
+
+    def agregar(self, df, huella, nombre=""):
+        """Agrega los registros nuevos de ``df`` (normalizado) y actualiza el cubo con ellos.
+
+        Devuelve la cantidad de filas nuevas. Un archivo ya cargado (misma huella) no se procesa,
+        aunque otra sesión lo esté agregando en este momento.
+        """
+        if self.contiene(huella):
+            return 0
+
+        registros = _a_registros(df)
+        with closing(self._conectar()) as con:
+            # Transacción explícita: BEGIN IMMEDIATE toma el candado de escritura al empezar, así
+            # una carga simultánea espera (hasta el timeout) en vez de fallar con 'database is locked'
+            con.isolation_level = None
+            with con:
+                con.execute("BEGIN IMMEDIATE")
+                # Otra sesión pudo haber cargado el mismo archivo mientras se esperaba el candado
+                if con.execute("SELECT 1 FROM archivos WHERE huella = ?", (huella,)).fetchone():
+                    return 0
+                return self._insertar(con, registros, huella, nombre, len(df))
+
+    def _insertar(self, con, registros, huella, nombre, filas):
+        """Inserta ``registros`` dentro de la transacción abierta en ``con``; devuelve las filas nuevas."""
+        con.execute(f"CREATE TEMP TABLE nuevos ({', '.join(COLUMNAS_REGISTROS)})")
+        con.executemany(
+            f"INSERT INTO nuevos VALUES ({', '.join('?' * len(COLUMNAS_REGISTROS))})",
+            registros.itertuples(index=False, name=None),
+        )
+        # Solo quedan las filas que no están en el almacén ni repetidas dentro del archivo
+        con.execute("""
+            DELETE FROM nuevos
+            WHERE EXISTS (SELECT 1 FROM registros r WHERE r.equipo = nuevos.equipo AND r.inicio = nuevos.inicio)
+               OR rowid NOT IN (SELECT MIN(rowid) FROM nuevos GROUP BY equipo, inicio)
+        """)
+        filas_nuevas = con.execute("SELECT COUNT(*) FROM nuevos").fetchone()[0]
+        con.execute(f"INSERT INTO registros ({', '.join(COLUMNAS_REGISTROS)}) SELECT * FROM nuevos")
+        con.execute("""
+            INSERT INTO cubo (fecha, frente, equipo, gop, operacion, horas, registros)
+            SELECT fecha, frente, equipo, COALESCE(gop, ''), COALESCE(operacion, ''), TOTAL(duracion_h), COUNT(*)
+            FROM nuevos
+            GROUP BY 1, 2, 3, 4, 5
+            ON CONFLICT (fecha, frente, equipo, gop, operacion) DO UPDATE SET
+                horas = horas + excluded.horas,
+                registros = registros + excluded.registros
+        """)
+        con.execute(
+            "INSERT INTO archivos VALUES (?, ?, ?, ?, ?)",
+            (huella, nombre, datetime.now().isoformat(timespec="seconds"), filas, filas_nuevas),
+        )
+        con.execute("DROP TABLE nuevos")
+        return filas_nuevas
+
+    def rango_fechas(self):
+        """(primera, última) fecha con datos, o (None, None) si el almacén está vacío."""
+        with closing(self._conectar()) as con:
+            return con.execute("SELECT MIN(fecha), MAX(fecha) FROM cubo").fetchone()
+
+    def cubo(self, desde, hasta):
+        """Cubo de horas entre dos fechas (inclusive), con el formato de ``calculos.construir_cubo``."""
+        with closing(self._conectar()) as con:
+            tabla = pd.read_sql_query(
+                """
+                SELECT frente, equipo, gop, operacion, SUM(horas) AS Horas, SUM(registros) AS Registros
+                FROM cubo
+                WHERE fecha BETWEEN ? AND ?
+                GROUP BY frente, equipo, gop, operacion
+                """,
+                con,
+                params=(str(desde), str(hasta)),
+            )
+        tabla = tabla.rename(columns={
+            "frente": calculos.FRENTE,
+            "equipo": calculos.EQUIPO,
+            "gop": calculos.GOP,
+            "operacion": calculos.OPERACION,
+        })
+        for col in [calculos.GOP, calculos.OPERACION]:
+            tabla[col] = tabla[col].mask(tabla[col] == "")
+        return calculos.cubo_desde_tabla(tabla)
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if len(argv) < 2:
+        print(__doc__, file=sys.stderr)
+        return 1
+
+    almacen = Almacen(argv[0])
+    for ruta in argv[1:]:
+        with open(ruta, "rb") as f:
+            contenido = f.read()
+        huella = ingesta.huella(contenido)
+        if almacen.contiene(huella):
+            print(f"= {ruta}: ya estaba cargado")
+            continue
+        nuevas = almacen.agregar(ingesta.cargar(contenido, nombre=ruta), huella, os.path.basename(ruta))
+        print(f"✔ {ruta}: {nuevas:,} filas nuevas")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,207 @@
+"""Benchmark por etapas del pipeline de indicadores sobre datos sintéticos.
+
+Uso:
+    python benchmark.py --filas 10000 100000 1000000 --salida benchmark.json
+
+Cada etapa se mide por separado: tiempo (mejor de ``--repeticiones``) y pico de memoria
+asignada (tracemalloc, en una corrida aparte para no inflar los tiempos). La lectura de
+Excel solo se mide hasta ``--max-filas-excel`` filas, porque escribir el archivo de prueba
+es mucho más lento que leerlo.
+
+Antes de las etapas se mide el arranque de la app en un proceso nuevo (como el primer
+acceso a un pod recién creado): la primera ejecución de ``indicadores.py`` y los reruns de la
+página vacía, sin archivo subido.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+import tracemalloc
+from io import BytesIO
+
+import pandas as pd
+
+import calculos
+import calidad
+import generador
+import graficos
+import ingesta
+import intervalos
+import motores
+
+
+def medir(funcion, repeticiones=1):
+    """Ejecuta ``funcion`` y devuelve (resultado, segundos, pico de memoria en MB)."""
+    segundos = float("inf")
+    for _ in range(repeticiones):
+        t0 = time.perf_counter()
+        resultado = funcion()
+        segundos = min(segundos, time.perf_counter() - t0)
+
+    tracemalloc.start()
+    try:
+        funcion()
+        _, pico = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return resultado, segundos, pico / 1024 ** 2
+
+
+# Se ejecuta en un proceso aparte para que ningún módulo de la app esté importado todavía
+_CODIGO_ARRANQUE = """
+import json, sys, time
+from streamlit.testing.v1 import AppTest
+
+app = AppTest.from_file(sys.argv[1], default_timeout=120)
+t0 = time.perf_counter()
+app.run()
+primera = time.perf_counter() - t0
+reruns = []
+for _ in range(int(sys.argv[2])):
+    t0 = time.perf_counter()
+    app.run()
+    reruns.append(time.perf_counter() - t0)
+print(json.dumps({"primera": primera, "rerun": min(reruns), "modulos": sorted(sys.modules)}))
+"""
+
+
+def arranque(repeticiones=3):
+    """Arranque en frío de la app: {"primera": s, "rerun": s, "modulos": [...]}, medido en un proceso nuevo."""
+    directorio = os.path.dirname(os.path.abspath(__file__))
+    salida = subprocess.run(
+        [sys.executable, "-c", _CODIGO_ARRANQUE, os.path.join(directorio, "indicadores.py"), str(repeticiones)],
+        cwd=directorio, capture_output=True, text=True, check=True,
+    )
+    return json.loads(salida.stdout.strip().splitlines()[-1])
+
+
+def _excel_en_memoria(crudo):
+    buffer = BytesIO()
+    crudo.to_excel(buffer, index=False)
+    return buffer.getvalue()
+
+
+def _render_vista(tablas):
+    """Dibuja los gráficos de una vista sin pasar por la caché de imágenes."""
+    for frente, subset in tablas["resumen"].groupby("Frente", observed=True):
+        graficos.a_png(graficos.figura_riesgo(subset, frente, 0.4))
+    if not tablas["top5"].empty:
+        graficos.a_png(graficos.figura_top5(tablas["top5"]))
+    prod = tablas["tabla_rangos"][tablas["tabla_rangos"]["GOP"] == "PRODUCTIVO"]
+    if not prod.empty:
+        graficos.a_png(graficos.figura_productivos(prod))
+
+
+def etapas(crudo, max_filas_excel):
+    """Lista ordenada de (nombre, función) a medir; cada función usa el resultado de las anteriores."""
+    estado = {}
+
+    def leer_excel():
+        return pd.read_excel(BytesIO(estado["excel"]))
+
+    def leer_excel_streaming():
+        return ingesta.leer_excel_streaming(estado["excel"])
+
+    def parsear_fechas():
+        return ingesta.parsear_fecha(estado["fechas_texto"])
+
+    def normalizar():
+        estado["df"] = ingesta.normalizar(crudo.copy())
+        return estado["df"]
+
+    def validar_intervalos():
+        return calidad.barrido(estado["df"])
+
+    def construir_cubo():
+        estado["cubo"] = calculos.construir_cubo(estado["df"])
+        return estado["cubo"]
+
+    def cubo_motor(motor):
+        return lambda: motores.construir_cubo(estado["df"], motor)
+
+    def horas_por_gop():
+        estado["horas_gop"] = calculos.horas_por_gop(estado["cubo"], sin_fin=True)
+        return estado["horas_gop"]
+
+    def resumen_riesgo():
+        return calculos.resumen_riesgo(estado["horas_gop"])
+
+    def tabla_rangos():
+        return calculos.tabla_rangos(estado["horas_gop"])
+
+    def top5():
+        return calculos.top_perdida(estado["cubo"], sin_fin=True)
+
+    def tendencia_turno():
+        return intervalos.horas_por_cubeta(estado["df"], "turno")
+
+    def render():
+        _render_vista(calculos.calcular_vista(estado["cubo"], sin_fin=True))
+
+    lista = []
+    if len(crudo) <= max_filas_excel:
+        estado["excel"] = _excel_en_memoria(crudo)
+        lista += [("leer_excel", leer_excel), ("leer_excel_streaming", leer_excel_streaming)]
+    estado["fechas_texto"] = crudo["Hora de inicio"].dt.strftime(ingesta.FORMATO_FECHA)
+    lista += [
+        ("parsear_fechas", parsear_fechas),
+        ("normalizar", normalizar),
+        ("validar_intervalos", validar_intervalos),
+        ("construir_cubo", construir_cubo),
+        *[(f"construir_cubo[{motor}]", cubo_motor(motor)) for motor in motores.disponibles() if motor != "pandas"],
+        ("horas_por_gop", horas_por_gop),
+        ("resumen_riesgo", resumen_riesgo),
+        ("tabla_rangos", tabla_rangos),
+        ("top5", top5),
+        ("tendencia_turno", tendencia_turno),
+        ("render", render),
+    ]
+    return lista
+
+
+def correr(filas, repeticiones=3, max_filas_excel=100_000, semilla=0):
+    """Mide todas las etapas para un tamaño; devuelve una lista de dicts (una fila por etapa)."""
+    crudo = generador.generar(filas, semilla=semilla)
+    resultados = []
+    for nombre, funcion in etapas(crudo, max_filas_excel):
+        _, segundos, pico_mb = medir(funcion, repeticiones)
+        resultados.append({"filas": filas, "etapa": nombre, "segundos": segundos, "pico_mb": pico_mb})
+        print(f"{filas:>12,}  {nombre:<22} {segundos:>9.3f} s  {pico_mb:>9.1f} MB", flush=True)
+    return resultados
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark por etapas del pipeline de indicadores.")
+    parser.add_argument("--filas", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--repeticiones", type=int, default=3)
+    parser.add_argument("--max-filas-excel", type=int, default=100_000,
+                        help="Tamaño máximo para medir la lectura de Excel")
+    parser.add_argument("--semilla", type=int, default=0)
+    parser.add_argument("--salida", help="Archivo JSON donde guardar los resultados")
+    parser.add_argument("--sin-arranque", action="store_true", help="No medir el arranque en frío de la app")
+    args = parser.parse_args(argv)
+
+    print(f"{'filas':>12}  {'etapa':<22} {'tiempo':>11}  {'pico mem':>12}")
+    resultados = []
+    if not args.sin_arranque:
+        inicio = arranque(args.repeticiones)
+        for etapa, segundos in [("arranque_en_frio", inicio["primera"]), ("rerun_pagina_vacia", inicio["rerun"])]:
+            resultados.append({"filas": 0, "etapa": etapa, "segundos": segundos, "pico_mb": None})
+            print(f"{'-':>12}  {etapa:<22} {segundos:>9.3f} s", flush=True)
+        # Las librerías de gráficos y de Excel solo deben cargarse al usarlas
+        pesadas = [m for m in ["matplotlib", "seaborn", "openpyxl"] if m in inicio["modulos"]]
+        if pesadas:
+            print(f"{'':>12}  ⚠ importados al arrancar: {', '.join(pesadas)}", flush=True)
+    for filas in args.filas:
+        resultados += correr(filas, args.repeticiones, args.max_filas_excel, args.semilla)
+
+    if args.salida:
+        with open(args.salida, "w", encoding="utf-8") as f:
+            json.dump(resultados, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
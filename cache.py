@@ -0,0 +1,122 @@
+"""Caché de resultados compartida por todas las sesiones del proceso, con presupuesto de memoria.
+
+Las claves combinan la huella del archivo con los parámetros de cada cálculo, así que 30
+usuarios que suben el mismo archivo comparten un solo DataFrame y una sola copia de cada
+tabla. Los valores se devuelven sin copiar: quien los usa no debe modificarlos.
+"""
+import os
+import sys
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+# Memoria total que puede ocupar la caché; al superarla se descartan las entradas menos usadas
+MEMORIA_MB = float(os.environ.get("INDICADORES_CACHE_MB", "1024"))
+
+
+def tamano_mb(valor, vistos=None):
+    """Memoria aproximada de ``valor`` en MB (DataFrames, arrays y contenedores de ellos).
+
+    Un mismo objeto referenciado varias veces dentro de ``valor`` se cuenta una sola vez.
+    """
+    vistos = set() if vistos is None else vistos
+    if id(valor) in vistos:
+        return 0.0
+    vistos.add(id(valor))
+
+    if isinstance(valor, pd.DataFrame):
+        return float(valor.memory_usage(deep=True).sum()) / 1024 ** 2
+    if isinstance(valor, (pd.Series, pd.Index)):
+        return float(valor.memory_usage(deep=True)) / 1024 ** 2
+    if isinstance(valor, np.ndarray):
+        return valor.nbytes / 1024 ** 2
+    if isinstance(valor, dict):
+        return sum(tamano_mb(v, vistos) for v in valor.values())
+    if isinstance(valor, (list, tuple)):
+        return sum(tamano_mb(v, vistos) for v in valor)
+    if hasattr(valor, "__dict__"):
+        return sum(tamano_mb(v, vistos) for v in vars(valor).values())
+    return sys.getsizeof(valor) / 1024 ** 2
+
+
+class CacheCompartida:
+    """LRU segura entre hilos, limitada por memoria, con estadísticas de aciertos y fallos.
+
+    Si varias sesiones piden a la vez una clave que no está, solo una la calcula; las demás
+    esperan y reciben el mismo resultado. Los errores no se guardan.
+    """
+
+    def __init__(self, memoria_mb=MEMORIA_MB):
+        self.memoria_mb = memoria_mb
+        self._entradas = OrderedDict()  # clave -> (valor, tamaño en MB)
+        self._candado = threading.Lock()
+        self._calculando = {}  # clave -> candado de la clave mientras se calcula
+        self.aciertos = self.fallos = self.descartes = 0
+        self.ocupado_mb = 0.0
+
+    def __contains__(self, clave):
+        with self._candado:
+            return clave in self._entradas
+
+    def _buscar(self, clave):
+        with self._candado:
+            if clave in self._entradas:
+                self._entradas.move_to_end(clave)
+                self.aciertos += 1
+                return True, self._entradas[clave][0]
+        return False, None
+
+    def obtener(self, clave, calcular):
+        """Valor de ``clave``; si no está, lo calcula con ``calcular()`` y lo guarda."""
+        encontrado, valor = self._buscar(clave)
+        if encontrado:
+            return valor
+
+        with self._candado:
+            candado_clave = self._calculando.setdefault(clave, threading.Lock())
+        with candado_clave:
+            # Otra sesión pudo haberlo calculado mientras se esperaba el candado
+            encontrado, valor = self._buscar(clave)
+            if encontrado:
+                return valor
+            try:
+                valor = calcular()
+                self._guardar(clave, valor)
+            finally:
+                with self._candado:
+                    self._calculando.pop(clave, None)
+        return valor
+
+    def _guardar(self, clave, valor):
+        tamano = tamano_mb(valor)
+        with self._candado:
+            self.fallos += 1
+            # Un valor más grande que todo el presupuesto se devuelve pero no se guarda
+            if tamano > self.memoria_mb or clave in self._entradas:
+                return
+            self._entradas[clave] = (valor, tamano)
+            self.ocupado_mb += tamano
+            while self.ocupado_mb > self.memoria_mb:
+                _, (_, liberado) = self._entradas.popitem(last=False)
+                self.ocupado_mb -= liberado
+                self.descartes += 1
+
+    def vaciar(self):
+        with self._candado:
+            self._entradas.clear()
+            self.ocupado_mb = 0.0
+
+    def estadisticas(self):
+        with self._candado:
+            consultas = self.aciertos + self.fallos
+            return {
+                "entradas": len(self._entradas),
+                "ocupado_mb": round(self.ocupado_mb, 1),
+                "memoria_mb": self.memoria_mb,
+                "aciertos": self.aciertos,
+                "fallos": self.fallos,
+                "descartes": self.descartes,
+                "tasa_aciertos": self.aciertos / consultas if consultas else 0.0,
+            }
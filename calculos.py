@@ -0,0 +1,189 @@
+import pandas as pd
+
+# ==========================================
+# CONSTANTES DEL MODELO
+# ==========================================
+VISTAS = {"con_fin": False, "sin_fin": True}
+
+FIN_OPERACION = "FIN DE OPERACION DE LA MAQUINA"
+
+FRENTE = "Frente"
+EQUIPO = "Código de equipo"
+GOP = "GOP"
+OPERACION = "Descripción de la operación"
+
+NIVELES_CUBO = [FRENTE, EQUIPO, GOP, OPERACION]
+NIVELES_GOP = [FRENTE, EQUIPO, GOP]
+
+GOP_RIESGO = ["PERDIDA", "MANTENIMIENTO"]
+UMBRAL_RIESGO = 60
+BINS = [0, 10, 20, 30, 40, 50, 60, 100]
+LABELS = ["0-10%", "10-20%", "20-30%", "30-40%", "40-50%", "50-60%", "60-100%"]
+
+
+def construir_cubo(df):
+    """Horas y número de registros por (Frente, equipo, GOP, operación).
+
+    Es la única pasada sobre las filas crudas: las vistas CON y SIN "Fin de Operación" se
+    derivan de este cubo. La columna 'Fin' marca la porción de FIN_OPERACION, que es la que
+    se resta para obtener la vista SIN. Se conservan las claves nulas (dropna=False) porque
+    los totales por equipo incluyen registros sin GOP.
+    """
+    cubo = df.groupby(NIVELES_CUBO, observed=True, dropna=False).agg(
+        Horas=("Duracion_h", "sum"),
+        Registros=("Duracion_h", "size"),
+    )
+    cubo["Fin"] = cubo.index.get_level_values(OPERACION) == FIN_OPERACION
+    return cubo
+
+
+def cubo_desde_tabla(tabla):
+    """Cubo a partir de una tabla plana con las columnas de NIVELES_CUBO, 'Horas' y 'Registros'.
+
+    Sirve para cubos que no salen de ``construir_cubo``, como los del almacén local.
+    """
+    tabla = tabla.copy()
+    for col in NIVELES_CUBO:
+        tabla[col] = tabla[col].astype("category")
+    cubo = tabla.set_index(NIVELES_CUBO)[["Horas", "Registros"]]
+    cubo["Fin"] = cubo.index.get_level_values(OPERACION) == FIN_OPERACION
+    return cubo
+
+
+def sumar_cubos(cubos):
+    """Un solo cubo con la suma de ``cubos`` (p. ej. el acumulado y el de las filas nuevas).
+
+    Trabaja sobre las filas de los cubos, no sobre los registros: el costo no depende de
+    cuántos registros se hayan acumulado.
+    """
+    tabla = pd.concat([cubo[["Horas", "Registros"]].reset_index() for cubo in cubos], ignore_index=True)
+    # Cada cubo trae sus propias categorías: se unifican como texto antes de agrupar
+    for col in NIVELES_CUBO:
+        tabla[col] = tabla[col].astype(object)
+    tabla = tabla.groupby(NIVELES_CUBO, dropna=False, sort=False)[["Horas", "Registros"]].sum().reset_index()
+    return cubo_desde_tabla(tabla)
+
+
+def _agregar(cubo, niveles, sin_fin):
+    """Suma el cubo a ``niveles``; con ``sin_fin`` resta la porción de FIN_OPERACION."""
+    agregado = cubo.groupby(level=niveles, observed=True, dropna=False)[["Horas", "Registros"]].sum()
+    if sin_fin and cubo["Fin"].any():
+        fin = cubo[cubo["Fin"]].groupby(level=niveles, observed=True, dropna=False)[["Horas", "Registros"]].sum()
+        agregado = agregado.sub(fin.reindex(agregado.index, fill_value=0))
+        # Grupos que solo tenían registros de FIN_OPERACION desaparecen de la vista SIN
+        agregado = agregado[agregado["Registros"] > 0]
+    return agregado
+
+
+def horas_por_gop(cubo, sin_fin=False):
+    """Horas por (Frente, equipo, GOP) con el total del equipo y el porcentaje de cada GOP."""
+    agregado = _agregar(cubo, NIVELES_GOP, sin_fin).reset_index()
+    agregado = agregado[agregado[EQUIPO].notna()]
+
+    # El total del equipo incluye los registros sin GOP, igual que antes del cubo
+    agregado["Total_h"] = agregado.groupby([FRENTE, EQUIPO], observed=True)["Horas"].transform("sum")
+    agregado = agregado[agregado[GOP].notna()]
+
+    horas = agregado[NIVELES_GOP].copy()
+    for col in [FRENTE, GOP]:
+        horas[col] = horas[col].cat.remove_unused_categories()
+    horas["Duracion_h"] = agregado["Horas"]
+    horas["Total_h"] = agregado["Total_h"]
+    horas["%_GOP"] = (horas["Duracion_h"] / horas["Total_h"]) * 100
+    return horas.reset_index(drop=True)
+
+
+def resumen_riesgo(horas_gop, umbral=UMBRAL_RIESGO, gop_riesgo=GOP_RIESGO):
+    """Cantidad de equipos por Frente y GOP que superan ``umbral`` % en los GOP de riesgo."""
+    equipos = horas_gop[
+        (horas_gop[GOP].isin(gop_riesgo)) &
+        (horas_gop["%_GOP"] > umbral)
+    ]
+    return equipos.groupby([FRENTE, GOP], observed=True)[EQUIPO].count().reset_index(name="Cantidad_Equipos")
+
+
+def tabla_equipos(horas_gop, umbral=UMBRAL_RIESGO, gop_riesgo=GOP_RIESGO):
+    """Una fila por equipo con sus horas, el % de cada GOP y si está en riesgo (los en riesgo primero).
+
+    Un equipo está en riesgo si supera ``umbral`` % en alguno de ``gop_riesgo``, igual que en
+    ``resumen_riesgo``; aquí se listan los equipos en vez de contarlos.
+    """
+    porcentajes = horas_gop.set_index([FRENTE, EQUIPO, GOP])["%_GOP"].unstack(GOP, fill_value=0)
+    porcentajes.columns = [f"% {gop}" for gop in porcentajes.columns]
+    riesgo = horas_gop[horas_gop[GOP].isin(gop_riesgo)]
+
+    tabla = pd.DataFrame({
+        "Total_h": horas_gop.groupby([FRENTE, EQUIPO], observed=True)["Total_h"].first(),
+        "% en riesgo": riesgo.groupby([FRENTE, EQUIPO], observed=True)["%_GOP"].sum(),
+        "En riesgo": (riesgo["%_GOP"] > umbral).groupby([riesgo[FRENTE], riesgo[EQUIPO]], observed=True).any(),
+    }).join(porcentajes)
+    tabla["% en riesgo"] = tabla["% en riesgo"].fillna(0)
+    tabla["En riesgo"] = tabla["En riesgo"].fillna(False).astype(bool)
+    return tabla.sort_values(["En riesgo", "% en riesgo"], ascending=False).reset_index()
+
+
+def top_perdida(cubo, sin_fin=False, n=5):
+    """Las ``n`` actividades con más % de horas en PERDIDA por frente."""
+    perdida = cubo[cubo.index.get_level_values(GOP) == "PERDIDA"]
+    resumen = _agregar(perdida, [FRENTE, OPERACION], sin_fin).reset_index()
+    resumen = resumen[resumen[OPERACION].notna()]
+    resumen = resumen.rename(columns={OPERACION: "Actividad"})[[FRENTE, "Actividad", "Horas"]]
+    resumen["%"] = 100 * resumen["Horas"] / resumen.groupby(FRENTE, observed=True)["Horas"].transform("sum")
+    return (
+        resumen.sort_values([FRENTE, "%"], ascending=[True, False], kind="stable")
+        .groupby(FRENTE, observed=True)
+        .head(n)
+        .reset_index(drop=True)
+    )
+
+
+def tabla_rangos(horas_gop, bins=BINS, labels=LABELS):
+    """Equipos y % promedio por Frente, GOP y rango de porcentaje de horas."""
+    horas = horas_gop.copy()
+    horas["Rango_Productividad"] = pd.cut(horas["%_GOP"], bins=bins, labels=labels, include_lowest=True)
+    # observed=False: cada Frente/GOP conserva todos los rangos (con 0 equipos si está vacío)
+    return horas.groupby([FRENTE, GOP, "Rango_Productividad"], observed=False).agg(
+        Equipos=(EQUIPO, "nunique"),
+        Promedio=("%_GOP", "mean")
+    ).reset_index()
+
+
+def etiquetas_rangos(bins):
+    """Etiquetas de los rangos de ``bins``, p. ej. [0, 10, 20] -> ["0-10%", "10-20%"]."""
+    return [f"{a:g}-{b:g}%" for a, b in zip(bins[:-1], bins[1:])]
+
+
+def vista_base(cubo, sin_fin=False):
+    """Parte costosa de una vista: % por equipo/GOP y top 5 de pérdidas.
+
+    No depende del umbral ni de los rangos, así que se puede guardar en caché y reutilizar
+    mientras el usuario cambia esos parámetros.
+    """
+    return {
+        "horas_gop": horas_por_gop(cubo, sin_fin),
+        "top5": top_perdida(cubo, sin_fin),
+    }
+
+
+def completar_vista(base, umbral=UMBRAL_RIESGO, gop_riesgo=GOP_RIESGO, bins=BINS, labels=None):
+    """Agrega a ``base`` las tablas que dependen de los parámetros interactivos (pasos baratos)."""
+    horas_gop = base["horas_gop"]
+    return {
+        **base,
+        "resumen": resumen_riesgo(horas_gop, umbral, gop_riesgo),
+        "tabla_rangos": tabla_rangos(horas_gop, bins, labels or etiquetas_rangos(bins)),
+    }
+
+
+def calcular_vista(cubo, sin_fin=False, **parametros):
+    """Todas las tablas que muestra una vista del dashboard."""
+    return completar_vista(vista_base(cubo, sin_fin), **parametros)
+
+
+def calcular_kpis(df, construir=construir_cubo):
+    """Tablas de ambas vistas a partir del DataFrame normalizado: {vista: {tabla: DataFrame}}.
+
+    ``construir`` arma el cubo; permite usar otro motor (ver ``motores.construir_cubo``).
+    """
+    cubo = construir(df)
+    return {vista: calcular_vista(cubo, sin_fin) for vista, sin_fin in VISTAS.items()}
@@ -0,0 +1,112 @@
+"""Validación de los intervalos de cada equipo: solapes (horas contadas dos veces) y huecos.
+
+Las filas se ordenan por (equipo, Hora de inicio) y se recorren en una sola pasada
+vectorizada: para cada registro se calcula hasta dónde llegaba lo ya registrado para su
+equipo (máximo acumulado de 'Hora de finalización'). Lo que el registro tiene antes de ese
+punto es solape; el tiempo entre ese punto y su inicio es hueco.
+"""
+import os
+
+import numpy as np
+import pandas as pd
+
+import calculos
+import intervalos
+
+# Huecos más cortos que esto (en minutos) no se reportan
+HUECO_MIN = float(os.environ.get("INDICADORES_HUECO_MIN", "15"))
+
+
+def _ordenados(df):
+    """Posiciones de las filas válidas ordenadas por (equipo, inicio), con sus códigos y tiempos en ns.
+
+    Se descartan las filas sin equipo, sin fechas o con fin anterior al inicio.
+    """
+    codigos = df[calculos.EQUIPO].cat.codes.to_numpy()
+    inicio, inicio_nulo = intervalos.a_ns(df["Hora de inicio"])
+    fin, fin_nulo = intervalos.a_ns(df["Hora de finalización"])
+    filas = np.flatnonzero((codigos >= 0) & ~inicio_nulo & ~fin_nulo & (fin >= inicio))
+
+    filas = filas[intervalos.ordenar_por_equipo(codigos[filas], inicio[filas])]
+    return filas, codigos[filas], inicio[filas], fin[filas]
+
+
+def barrido(df):
+    """Solape y hueco de cada registro respecto a los registros anteriores del mismo equipo.
+
+    Devuelve un DataFrame con el índice de ``df``:
+      - 'Solape_h': horas del registro que ya estaban cubiertas por otro registro del equipo.
+      - 'Hueco_h': horas sin registros entre lo ya cubierto y el inicio del registro.
+      - 'Inicio_efectivo': inicio del registro después de recortar el solape.
+    Las filas que no se pueden validar (sin equipo o fechas, o con fin < inicio) quedan con NaN.
+    """
+    filas, codigos, inicio, fin = _ordenados(df)
+
+    # Fin máximo de los registros anteriores del mismo equipo; el primero de cada equipo no tiene anteriores
+    cubierto = pd.Series(fin).groupby(codigos, sort=False).cummax().to_numpy()
+    previo = np.roll(cubierto, 1)
+    primero = np.r_[True, codigos[1:] != codigos[:-1]] if len(codigos) else np.zeros(0, dtype=bool)
+    previo = np.where(primero, inicio, previo)
+
+    efectivo = np.maximum(inicio, np.minimum(previo, fin))
+    solape = np.full(len(df), np.nan)
+    hueco = np.full(len(df), np.nan)
+    solape[filas] = (efectivo - inicio) / intervalos.HORA_NS
+    hueco[filas] = np.maximum(inicio - previo, 0) / intervalos.HORA_NS
+
+    inicio_efectivo = df["Hora de inicio"].to_numpy(dtype="datetime64[ns]").copy()
+    inicio_efectivo[filas] = efectivo.astype("datetime64[ns]")
+
+    return pd.DataFrame({
+        "Solape_h": solape.astype("float32"),
+        "Hueco_h": hueco.astype("float32"),
+        "Inicio_efectivo": inicio_efectivo,
+    }, index=df.index)
+
+
+def recortar(df, marcas):
+    """Copia de ``df`` sin horas duplicadas: cada registro empieza donde termina lo ya cubierto.
+
+    Un registro totalmente contenido en otro queda con duración 0. La suma de 'Duracion_h'
+    por equipo pasa a ser el tiempo realmente cubierto por sus registros.
+    """
+    recortado = df.copy(deep=False)
+    recortado["Hora de inicio"] = marcas["Inicio_efectivo"]
+    recortado["Duracion_h"] = (df["Duracion_h"] - marcas["Solape_h"].fillna(0)).clip(lower=0).astype("float32")
+    return recortado
+
+
+def resumen(marcas, hueco_min=HUECO_MIN):
+    """Totales de calidad del archivo: registros validados, solapes y huecos (con sus horas)."""
+    hay_hueco = marcas["Hueco_h"] * 60 >= hueco_min
+    return {
+        "registros": len(marcas),
+        "sin_validar": int(marcas["Solape_h"].isna().sum()),
+        "solapes": int((marcas["Solape_h"] > 0).sum()),
+        "horas_solapadas": float(marcas["Solape_h"].sum()),
+        "huecos": int(hay_hueco.sum()),
+        "horas_huecos": float(marcas["Hueco_h"][hay_hueco].sum()),
+    }
+
+
+def por_equipo(df, marcas, hueco_min=HUECO_MIN):
+    """Solapes y huecos por (Frente, equipo); solo los equipos con alguno, de más a menos horas solapadas."""
+    hay_hueco = marcas["Hueco_h"] * 60 >= hueco_min
+    tabla = pd.DataFrame({
+        calculos.FRENTE: df[calculos.FRENTE],
+        calculos.EQUIPO: df[calculos.EQUIPO],
+        "Solapes": marcas["Solape_h"] > 0,
+        "Horas solapadas": marcas["Solape_h"],
+        "Huecos": hay_hueco,
+        "Horas en huecos": marcas["Hueco_h"].where(hay_hueco, 0),
+    }).groupby([calculos.FRENTE, calculos.EQUIPO], observed=True).sum()
+    tabla = tabla[(tabla["Solapes"] > 0) | (tabla["Huecos"] > 0)]
+    return tabla.sort_values(["Horas solapadas", "Horas en huecos"], ascending=False).reset_index()
+
+
+def solapados(df, marcas, n=1000):
+    """Los ``n`` registros con más horas solapadas, para revisarlos en detalle."""
+    filas = marcas["Solape_h"].to_numpy() > 0
+    detalle = df.loc[filas, [calculos.FRENTE, calculos.EQUIPO, calculos.OPERACION, "Hora de inicio", "Hora de finalización", "Duracion_h"]]
+    detalle = detalle.assign(Solape_h=marcas.loc[filas, "Solape_h"])
+    return detalle.nlargest(n, "Solape_h")
@@ -0,0 +1,136 @@
+"""Generador de registros sintéticos de equipos con las mismas columnas del archivo real.
+
+Uso:
+    python generador.py --filas 100000 --salida muestra.xlsx
+
+El formato de salida se toma de la extensión (.xlsx, .csv o .parquet).
+"""
+import argparse
+import sys
+
+import numpy as np
+import pandas as pd
+
+import calculos
+
+# Límite de filas de una hoja de Excel (sin contar el encabezado)
+MAX_FILAS_EXCEL = 1_048_575
+
+GRUPOS_EQUIPOS = {
+    "FRENTE TRACTOR MULA - CAMPO": "TM",
+    "FRENTE TRACTORES - CAMPO": "TR",
+    "FRENTE ALCES - CAMPO": "AL",
+}
+
+OPERACIONES = {
+    "PRODUCTIVO": ["COSECHA", "TRANSPORTE DE CAÑA", "CARGUE", "PREPARACION DE SUELO", "SIEMBRA"],
+    "AUXILIAR": ["TANQUEO", "DESPLAZAMIENTO", "LAVADO DE EQUIPO"],
+    "PERDIDA": [
+        "ESPERA DE CAÑA", "SIN OPERADOR", "LLUVIA", "ALMUERZO", "CAMBIO DE TURNO",
+        "ESPERA EN PATIO", calculos.FIN_OPERACION,
+    ],
+    "MANTENIMIENTO": ["MANTENIMIENTO CORRECTIVO", "MANTENIMIENTO PREVENTIVO", "LLANTAS"],
+}
+
+# Probabilidad de cada GOP según el perfil del equipo. Los equipos en riesgo pasan bastante
+# más que calculos.UMBRAL_RIESGO de su tiempo en PERDIDA o en MANTENIMIENTO (también sin
+# 'FIN DE OPERACION'), así que el gráfico de riesgo tiene equipos en ambos GOP.
+PERFILES = {
+    "normal": [0.55, 0.15, 0.22, 0.08],
+    "riesgo_perdida": [0.10, 0.03, 0.77, 0.10],
+    "riesgo_mantenimiento": [0.10, 0.03, 0.12, 0.75],
+}
+PROPORCION_RIESGO = 0.15
+
+
+def _categorica(codigos, etiquetas):
+    """Columna categórica con categorías ordenadas (como al leer un archivo), sin crear una cadena por fila."""
+    orden = np.argsort(etiquetas)
+    return pd.Categorical.from_codes(np.argsort(orden)[codigos], categories=etiquetas[orden])
+
+
+def generar(filas, equipos=None, desde="2025-01-01", semilla=0):
+    """DataFrame sintético con ``filas`` registros consecutivos por equipo.
+
+    Todo se construye con operaciones de NumPy y las columnas de texto son categóricas (un
+    código por fila), por lo que sirve para tamaños de 10k a 10M filas.
+    """
+    rng = np.random.default_rng(semilla)
+    equipos = equipos or max(10, min(2000, filas // 500))
+
+    # --- Equipos: grupo, código y perfil ---
+    nombres_grupo = np.array(list(GRUPOS_EQUIPOS))
+    grupo_equipo = rng.integers(0, len(nombres_grupo), equipos)
+    prefijos = np.array(list(GRUPOS_EQUIPOS.values()))[grupo_equipo]
+    codigos = np.char.add(np.char.add(prefijos, "-"), np.char.zfill(np.arange(1, equipos + 1).astype(str), 4))
+    # 0 = normal; los equipos en riesgo se reparten entre los dos perfiles de riesgo
+    perfil_equipo = np.where(rng.random(equipos) < PROPORCION_RIESGO, rng.integers(1, 3, equipos), 0)
+
+    # --- Registros: cada fila pertenece a un equipo; se ordenan por equipo ---
+    equipo = np.sort(rng.integers(0, equipos, filas))
+
+    # --- GOP y operación según el perfil del equipo ---
+    gops = np.array(list(OPERACIONES))
+    acumuladas = np.cumsum(list(PERFILES.values()), axis=1)
+    gop = (rng.random(filas)[:, None] > acumuladas[perfil_equipo[equipo]]).sum(axis=1)
+    gop = np.minimum(gop, len(gops) - 1)
+
+    operaciones = np.concatenate([OPERACIONES[g] for g in gops])
+    desplazamiento = np.cumsum([0] + [len(OPERACIONES[g]) for g in gops])
+    n_operaciones = np.diff(desplazamiento)
+    operacion = desplazamiento[gop] + (rng.random(filas) * n_operaciones[gop]).astype(int)
+
+    # --- Tiempos: actividades consecutivas por equipo, con huecos cortos ocasionales ---
+    duracion_min = np.clip(rng.lognormal(mean=3.6, sigma=0.9, size=filas), 1, 720).astype("int64")
+    hueco_min = np.where(rng.random(filas) < 0.05, rng.integers(5, 120, filas), 0)
+    paso = duracion_min + hueco_min
+    acumulado = np.cumsum(paso)
+    inicio_equipo = np.r_[0, np.flatnonzero(np.diff(equipo)) + 1]
+    base = np.repeat(acumulado[inicio_equipo] - paso[inicio_equipo], np.diff(np.r_[inicio_equipo, filas]))
+    inicio_min = acumulado - paso - base
+
+    origen = np.datetime64(pd.Timestamp(desde).to_datetime64(), "m")
+    inicio = origen + inicio_min.astype("timedelta64[m]")
+    fin = inicio + duracion_min.astype("timedelta64[m]")
+
+    return pd.DataFrame({
+        "Descripción del grupo de equipos": _categorica(grupo_equipo[equipo], nombres_grupo),
+        "Código de equipo": _categorica(equipo, codigos),
+        "Descripción del grupo de operaciones": _categorica(gop, gops),
+        "Descripción de la operación": _categorica(operacion, operaciones),
+        "Hora de inicio": inicio.astype("datetime64[ns]"),
+        "Hora de finalización": fin.astype("datetime64[ns]"),
+    })
+
+
+def guardar(df, ruta):
+    """Escribe el DataFrame en el formato indicado por la extensión de ``ruta``."""
+    if ruta.endswith(".xlsx"):
+        if len(df) > MAX_FILAS_EXCEL:
+            raise ValueError(f"Excel admite como máximo {MAX_FILAS_EXCEL:,} filas; use .csv o .parquet")
+        df.to_excel(ruta, index=False)
+    elif ruta.endswith(".csv"):
+        df.to_csv(ruta, index=False)
+    elif ruta.endswith(".parquet"):
+        df.to_parquet(ruta, index=False)
+    else:
+        raise ValueError(f"Extensión no soportada: {ruta}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Genera registros sintéticos de equipos.")
+    parser.add_argument("--filas", type=int, default=100_000)
+    parser.add_argument("--equipos", type=int, default=None, help="Cantidad de equipos (por defecto depende de --filas)")
+    parser.add_argument("--desde", default="2025-01-01", help="Fecha de inicio de los registros")
+    parser.add_argument("--semilla", type=int, default=0)
+    parser.add_argument("--salida", default="muestra.xlsx", help="Archivo de salida (.xlsx, .csv o .parquet)")
+    args = parser.parse_args(argv)
+
+    df = generar(args.filas, equipos=args.equipos, desde=args.desde, semilla=args.semilla)
+    guardar(df, args.salida)
+    print(f"{len(df):,} filas escritas en {args.salida}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
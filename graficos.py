@@ -0,0 +1,292 @@
+import hashlib
+import threading
+from collections import OrderedDict
+from io import BytesIO
+
+import pandas as pd
+
+# ==========================================
+# MATPLOTLIB DIFERIDO
+# ==========================================
+# matplotlib y seaborn tardan más en importarse que el resto de la app junta: se cargan al
+# dibujar el primer gráfico, no al abrir la página, y el estilo se aplica en ese momento.
+ESTILO = {
+    'font.family': 'sans-serif',
+    'font.size': 11,
+    'axes.titlesize': 13,
+    'axes.labelsize': 11,
+    'xtick.labelsize': 10,
+    'ytick.labelsize': 10,
+    'figure.titlesize': 14,
+    'figure.dpi': 120
+}
+
+_plt = None
+_candado_plt = threading.Lock()
+
+
+def pyplot():
+    """``matplotlib.pyplot`` con ESTILO aplicado; se importa la primera vez que se pide."""
+    global _plt
+    with _candado_plt:
+        if _plt is None:
+            import matplotlib.pyplot as plt
+
+            plt.rcParams.update(ESTILO)
+            _plt = plt
+    return _plt
+
+# ==========================================
+# CACHÉ DE IMÁGENES
+# ==========================================
+# Cada gráfico se guarda como PNG, identificado por el hash de los datos agregados que lo
+# alimentan. Si los datos no cambian entre reruns, la imagen se reutiliza sin volver a dibujar.
+MAX_IMAGENES = 64
+# Los mismos parámetros que usa st.pyplot por defecto
+OPCIONES_PNG = {"format": "png", "dpi": 200, "bbox_inches": "tight"}
+
+_imagenes = OrderedDict()
+_candado = threading.Lock()
+
+
+def figuras_vivas():
+    """Cantidad de figuras de matplotlib abiertas; debe volver a 0 después de cada render."""
+    return 0 if _plt is None else len(_plt.get_fignums())
+
+
+def huella_datos(datos):
+    """Hash estable del contenido de un DataFrame (valores y nombres de columnas)."""
+    h = hashlib.sha256(repr(list(datos.columns)).encode())
+    h.update(pd.util.hash_pandas_object(datos, index=False).to_numpy().tobytes())
+    return h.hexdigest()
+
+
+def a_png(fig):
+    """Convierte la figura a PNG y la cierra para liberar su memoria."""
+    buffer = BytesIO()
+    try:
+        fig.savefig(buffer, **OPCIONES_PNG)
+    finally:
+        pyplot().close(fig)
+    return buffer.getvalue()
+
+
+def imagen(construir, datos, *args):
+    """PNG del gráfico ``construir(datos, *args)``, tomado de la caché si los datos no cambiaron."""
+    clave = (construir.__name__, huella_datos(datos), args)
+    with _candado:
+        if clave in _imagenes:
+            _imagenes.move_to_end(clave)
+            return _imagenes[clave]
+
+    png = a_png(construir(datos, *args))
+
+    with _candado:
+        _imagenes[clave] = png
+        while len(_imagenes) > MAX_IMAGENES:
+            _imagenes.popitem(last=False)
+    return png
+
+
+# ==========================================
+# GRÁFICOS
+# ==========================================
+def figura_riesgo(subset_frente, frente, ancho_barra):
+    """Gráfico 1: equipos con más del umbral de horas en los GOP de riesgo, para un frente."""
+    # Configurar figura
+    fig, ax = pyplot().subplots(figsize=(8, 2))
+    colores = {"PERDIDA": "#e74c3c", "MANTENIMIENTO": "#3498db"}
+
+    # Barras
+    for gop in subset_frente["GOP"].unique():
+        valor = subset_frente[subset_frente["GOP"] == gop]["Cantidad_Equipos"].iloc[0]
+        barra = ax.bar(
+            gop,
+            valor,
+            color=colores.get(gop, "#95a5a6"),
+            edgecolor='white',
+            linewidth=1.5,
+            width=ancho_barra
+        )
+        # Etiqueta encima de la barra
+        ax.text(
+            barra[0].get_x() + barra[0].get_width() / 2,
+            valor + 0.1,
+            f'{int(valor)}',
+            ha='center',
+            va='bottom',
+            fontsize=12,
+            fontweight='bold',
+            color=colores.get(gop, "#95a5a6")
+        )
+
+    # Estilo minimalista
+    ax.set_title(f"{frente.upper()}", fontsize=14, fontweight='bold', pad=15, loc='left', color='#2c3e50')
+    ax.set_ylabel("Cantidad de Equipos", fontsize=9, color='#7f8c8d')
+    ax.set_xlabel("")
+    ax.spines['top'].set_visible(False)
+    ax.spines['right'].set_visible(False)
+    ax.spines['left'].set_color('#bdc3c7')
+    ax.spines['bottom'].set_color('#bdc3c7')
+    ax.grid(axis='y', linestyle='--', alpha=0.5, color='#ecf0f1')
+    ax.set_axisbelow(True)
+    ax.set_ylim(0, max(subset_frente["Cantidad_Equipos"]) * 1.2 if not subset_frente.empty else 1)
+    return fig
+
+
+def figura_top5(top5):
+    """Gráfico 2: top 5 de actividades en pérdida, un panel por frente."""
+    frentes = top5["Frente"].unique()
+    n_frentes = len(frentes)
+    fig_height = max(5, n_frentes * 3.5)
+    fig, axes = pyplot().subplots(n_frentes, 1, figsize=(12, fig_height))
+    if n_frentes == 1:
+        axes = [axes]
+
+    for ax, frente in zip(axes, frentes):
+        subset = top5[top5["Frente"] == frente].copy()
+        bars = ax.barh(
+            subset["Actividad"],
+            subset["%"],
+            color="#e74c3c",  # 🔴 ROJO
+            edgecolor='white',
+            linewidth=1.0,
+            height=0.6
+        )
+        ax.set_title(f"{frente.upper()}", fontsize=14, fontweight='bold', pad=15, loc='left', color='#2c3e50')
+        ax.set_xlabel("% de horas perdidas", fontsize=11, color='#7f8c8d')
+        ax.set_ylabel("Actividad", fontsize=11, color='#7f8c8d')
+        ax.invert_yaxis()
+        ax.grid(axis='x', linestyle='--', alpha=0.6, linewidth=0.8, color='#ecf0f1')
+        ax.set_axisbelow(True)
+        ax.spines['top'].set_visible(False)
+        ax.spines['right'].set_visible(False)
+
+        # Etiquetas de valor
+        for bar in bars:
+            width = bar.get_width()
+            ax.text(
+                width + 0.8,
+                bar.get_y() + bar.get_height()/2,
+                f'{width:.1f}%',
+                va='center',
+                fontsize=10,
+                fontweight='bold',
+                color='#c0392b'
+            )
+
+    fig.tight_layout(pad=3.0)
+    return fig
+
+
+def figura_productivos(df_prod):
+    """Gráfico 4: equipos PRODUCTIVO por rango de eficiencia, un panel por frente."""
+    df_prod = df_prod.copy()
+    orden = list(df_prod["Rango_Productividad"].cat.categories)
+    df_prod["Rango_Productividad"] = pd.Categorical(df_prod["Rango_Productividad"], categories=orden, ordered=True)
+
+    pyplot()
+    import seaborn as sns
+
+    g = sns.catplot(
+        data=df_prod,
+        x="Rango_Productividad",
+        y="Equipos",
+        kind="bar",
+        col="Frente",
+        col_wrap=2,
+        height=5,
+        aspect=1.2,
+        palette=["#27ae60"] * len(df_prod),  # 🟩 VERDE
+        edgecolor='white',
+        linewidth=1.2
+    )
+    g.set_titles("{col_name}", size=13, weight='bold', color='#2c3e50')
+    g.set_axis_labels("Rango de Productividad", "Número de Equipos", size=11, color='#7f8c8d')
+    g.set_xticklabels(rotation=45, size=10)
+
+    # Agregar etiquetas en cada subplot
+    for ax in g.axes.flat:
+        for bar in ax.patches:
+            height = bar.get_height()
+            if height > 0:
+                ax.text(
+                    bar.get_x() + bar.get_width() / 2,
+                    height + 0.2,
+                    f'{int(height)}',
+                    ha='center',
+                    va='bottom',
+                    fontsize=10,
+                    fontweight='bold',
+                    color='#2c3e50'
+                )
+        ax.grid(axis='y', linestyle='--', alpha=0.6, linewidth=0.8, color='#ecf0f1')
+        ax.set_axisbelow(True)
+        ax.spines['top'].set_visible(False)
+        ax.spines['right'].set_visible(False)
+
+    g.figure.tight_layout()
+    return g.figure
+
+
+def figura_tendencia(tendencia):
+    """Gráfico 5: % de horas de cada GOP por periodo, un panel por frente."""
+    colores = {"PRODUCTIVO": "#27ae60", "PERDIDA": "#e74c3c", "MANTENIMIENTO": "#3498db"}
+    frentes = tendencia["Frente"].unique()
+    n_frentes = len(frentes)
+    fig, axes = pyplot().subplots(n_frentes, 1, figsize=(12, max(4, n_frentes * 3.5)), sharex=True)
+    if n_frentes == 1:
+        axes = [axes]
+
+    for ax, frente in zip(axes, frentes):
+        subset = tendencia[tendencia["Frente"] == frente]
+        for gop, serie in subset.groupby("GOP", observed=True):
+            ax.plot(
+                serie["Cubeta"],
+                serie["%"],
+                marker='o',
+                markersize=3,
+                linewidth=1.8,
+                color=colores.get(gop, "#95a5a6"),
+                label=str(gop).capitalize()
+            )
+        ax.set_title(f"{frente.upper()}", fontsize=14, fontweight='bold', pad=15, loc='left', color='#2c3e50')
+        ax.set_ylabel("% de horas", fontsize=11, color='#7f8c8d')
+        ax.set_ylim(0, 100)
+        ax.grid(axis='y', linestyle='--', alpha=0.6, linewidth=0.8, color='#ecf0f1')
+        ax.set_axisbelow(True)
+        ax.spines['top'].set_visible(False)
+        ax.spines['right'].set_visible(False)
+        ax.legend(loc='upper left', bbox_to_anchor=(1, 1), frameon=False, fontsize=10)
+
+    fig.autofmt_xdate()
+    fig.tight_layout(pad=3.0)
+    return fig
+
+
+def figura_linea_tiempo(registros, equipo):
+    """Gráfico de detalle: actividades de un equipo en el tiempo, coloreadas por GOP."""
+    import matplotlib.dates as mdates
+
+    colores = {"PRODUCTIVO": "#27ae60", "PERDIDA": "#e74c3c", "MANTENIMIENTO": "#3498db"}
+    fig, ax = pyplot().subplots(figsize=(12, 2.2))
+
+    inicio = mdates.date2num(registros["Hora de inicio"])
+    ancho = mdates.date2num(registros["Hora de finalización"]) - inicio
+    for gop, filas in registros.groupby("GOP", observed=True).indices.items():
+        ax.broken_barh(
+            list(zip(inicio[filas], ancho[filas])),
+            (0, 1),
+            facecolors=colores.get(gop, "#95a5a6"),
+            label=str(gop).capitalize()
+        )
+
+    ax.set_title(f"{equipo}", fontsize=14, fontweight='bold', pad=15, loc='left', color='#2c3e50')
+    ax.xaxis_date()
+    ax.set_yticks([])
+    ax.spines['top'].set_visible(False)
+    ax.spines['right'].set_visible(False)
+    ax.spines['left'].set_visible(False)
+    ax.legend(loc='upper left', bbox_to_anchor=(1, 1), frameon=False, fontsize=10)
+    fig.autofmt_xdate()
+    return fig
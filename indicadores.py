@@ -1,23 +1,28 @@
+import os
 import streamlit as st
 import pandas as pd
-import numpy as np
-import matplotlib.pyplot as plt
-import seaborn as sns
-from io import BytesIO
-
-# ==========================================
-# CONFIGURACIÓN GLOBAL DE ESTILO
-# ==========================================
-plt.rcParams.update({
-    'font.family': 'sans-serif',
-    'font.size': 11,
-    'axes.titlesize': 13,
-    'axes.labelsize': 11,
-    'xtick.labelsize': 10,
-    'ytick.labelsize': 10,
-    'figure.titlesize': 14,
-    'figure.dpi': 120
-})
+from datetime import date
+
+import calculos
+import calidad
+import graficos
+import ingesta
+import intervalos
+import motores
+import reporte
+import vivo
+from almacen import RUTA_ALMACEN, Almacen
+from cache import MEMORIA_MB, CacheCompartida
+from indice import Indice
+from perfil import PERFIL_ENV, Perfil
+
+# El estilo de los gráficos (graficos.ESTILO) se aplica al importar matplotlib, la primera
+# vez que se dibuja un gráfico: la página inicial no carga matplotlib ni seaborn.
+
+# Logo incluido con la app (assets/logo-manuelita.jpg, el arte oficial); mientras no esté en
+# el despliegue se usa el del sitio web
+RUTA_LOGO = os.path.join(os.path.dirname(os.path.abspath(__file__)), "assets", "logo-manuelita.jpg")
+URL_LOGO = "https://www.manuelita.com/wp-content/uploads/2017/01/Logo-manuelita.jpg"
 
 # Configuración de Streamlit
 st.set_page_config(
@@ -32,117 +37,218 @@ st.markdown("""
     .block-container { padding: 2rem 3rem; }
     h1, h2, h3 { color: #2c3e50; font-weight: 700; }
     h3 { border-left: 4px solid #3498db; padding-left: 10px; margin-top: 1.5rem; }
-    .stTabs [data-baseweb="tab-list"] { gap: 24px; }
-    .stTabs [data-baseweb="tab"] { height: 50px; white-space: pre-wrap; background-color: #f8f9fa; border-radius: 6px 6px 0 0; }
-    .stTabs [aria-selected="true"] { background-color: #2c3e50; color: white; }
+    div[role="radiogroup"] { gap: 24px; }
+    div[role="radiogroup"] label { padding: 10px 16px; background-color: #f8f9fa; border-radius: 6px 6px 0 0; }
+    div[role="radiogroup"] label:has(input:checked) { background-color: #2c3e50; color: white; }
     </style>
 """, unsafe_allow_html=True)
 
 st.title("📊 Dashboard Ejecutivo: Productividad de Equipos")
 st.markdown("<small style='color: #7f8c8d;'>Análisis comparativo con y sin operación de cierre. Datos actualizados en tiempo real.</small>", unsafe_allow_html=True)
 
+# --- Perfilado opcional por etapas (?perfil=1 en la URL o INDICADORES_PERFIL=1) ---
+perfil = Perfil(activo=PERFIL_ENV or st.query_params.get("perfil", "").lower() in ("1", "true"))
+
+# --- Fuentes opcionales: almacén local (INDICADORES_ALMACEN=ruta.db) y modo en vivo (INDICADORES_VIVO=ruta) ---
+FUENTE_ARCHIVO = "📂 Archivo subido"
+FUENTE_ALMACEN = "🗄️ Almacén local"
+FUENTE_VIVO = "📡 En vivo"
+
+
+@st.cache_resource
+def abrir_almacen(ruta):
+    return Almacen(ruta)
+
+
+@st.cache_resource
+def abrir_seguimiento(ruta):
+    # Un solo seguimiento por ruta para todas las sesiones: cada dato nuevo se lee una vez
+    return vivo.Seguimiento(ruta)
+
+
+almacen = abrir_almacen(RUTA_ALMACEN) if RUTA_ALMACEN else None
+seguimiento = abrir_seguimiento(vivo.RUTA_VIVO) if vivo.RUTA_VIVO else None
+fuentes = [FUENTE_ARCHIVO] + ([FUENTE_ALMACEN] if almacen else []) + ([FUENTE_VIVO] if seguimiento else [])
+fuente = st.sidebar.radio("Fuente de datos", fuentes, key="fuente") if len(fuentes) > 1 else FUENTE_ARCHIVO
+
 # --- Carga de archivo ---
-uploaded_file = st.file_uploader("📂 Sube tu archivo Excel", type=["xlsx"], label_visibility="collapsed")
+uploaded_file = st.file_uploader(
+    "📂 Sube tu archivo (Excel, CSV, Parquet o Arrow)", type=ingesta.EXTENSIONES, label_visibility="collapsed"
+)
 
-if uploaded_file is not None:
-    # Cargar datos
-    df = pd.read_excel(uploaded_file)
+# --- Caché compartida entre sesiones (INDICADORES_CACHE_MB) ---
+# Las claves empiezan por el hash del contenido: los reruns, las re-subidas del mismo archivo y
+# los demás usuarios que suben ese archivo reutilizan el mismo DataFrame y las mismas tablas.
+@st.cache_resource
+def abrir_cache(memoria_mb):
+    return CacheCompartida(memoria_mb)
 
-    # --- Crear columna 'Frente' ---
-    df["Frente"] = df["Descripción del grupo de equipos"].apply(
-        lambda x: "TRACTOMULA" if x == "FRENTE TRACTOR MULA - CAMPO" else "TRACTORES"
-    )
 
-    # --- Calcular duración en horas ---
-    df["Duracion_h"] = (
-        pd.to_datetime(df["Hora de finalización"]) - pd.to_datetime(df["Hora de inicio"])
-    ).dt.total_seconds() / 3600
+compartida = abrir_cache(MEMORIA_MB)
 
-    # --- Normalizar GOP ---
-    df["GOP"] = df["Descripción del grupo de operaciones"].apply(
-        lambda x: "PRODUCTIVO" if str(x).upper() == "AUXILIAR" else x
-    )
 
-    # --- Crear dos versiones de los datos ---
-    df_con_fin = df.copy()  # Con FIN DE OPERACION
-    df_sin_fin = df[df["Descripción de la operación"] != "FIN DE OPERACION DE LA MAQUINA"].copy()  # Sin FIN DE OPERACION
+def en_cache(clave, calcular, mensaje=None):
+    """Resultado compartido de ``calcular()``; muestra ``mensaje`` solo si hay que calcularlo."""
+    if mensaje is None or clave in compartida:
+        return compartida.obtener(clave, calcular)
+    with st.spinner(mensaje):
+        return compartida.obtener(clave, calcular)
+
+
+def huella_subida(archivo):
+    """Hash del archivo subido; se calcula una vez por subida (``file_id``), no en cada rerun."""
+    guardada = st.session_state.get("huella_subida")
+    if guardada is None or guardada[0] != archivo.file_id:
+        guardada = (archivo.file_id, ingesta.huella(archivo.getvalue()))
+        st.session_state["huella_subida"] = guardada
+    return guardada[1]
+
+
+def cargar_datos(clave, archivo, perfil):
+    # El contenido solo se copia de la subida si el archivo no está ya en la caché
+    def leer():
+        # Barra de progreso para los Excel grandes que se leen en streaming; se vacía al terminar
+        barra = st.empty()
+
+        def progreso(leidas, total):
+            if total:
+                barra.progress(min(leidas / total, 1.0), text=f"Leyendo Excel: {leidas:,} de {total:,} filas")
+            else:
+                barra.progress(0.0, text=f"Leyendo Excel: {leidas:,} filas")
+
+        try:
+            return ingesta.cargar(
+                archivo.getvalue(), nombre=archivo.name, clave=clave, perfil=perfil, progreso=progreso
+            )
+        finally:
+            barra.empty()
+
+    return en_cache(("datos", clave), leer, "Procesando archivo...")
+
+
+# --- Vistas disponibles: etiqueta -> (título, sin_fin, ancho de barra del gráfico 1) ---
+VISTAS = {
+    "📈 CON Fin de Operación": ("📈 Análisis CON 'FIN DE OPERACION DE LA MAQUINA'", False, 0.4),
+    "📉 SIN Fin de Operación": ("📉 Análisis SIN 'FIN DE OPERACION DE LA MAQUINA'", True, 0.6),
+}
+
 
-    # --- Crear pestañas ---
-    tab1, tab2 = st.tabs(["📈 CON Fin de Operación", "📉 SIN Fin de Operación"])
+# --- Validación de intervalos (solapes y huecos por equipo) ---
+# Se calcula una vez por archivo; el recorte opcional de solapes se aplica antes de agregar.
+VISTA_CALIDAD = "🧪 Calidad de datos"
 
-    # ===================================================
-    # PESTAÑA 1: CON FIN DE OPERACION
-    # ===================================================
-    with tab1:
-        st.header("📈 Análisis CON 'FIN DE OPERACION DE LA MAQUINA'")
-        df_actual = df_con_fin.copy()
 
-        # --- Gráfico 1: Equipos con >60% en Pérdida o Mantenimiento (DISEÑO GERENCIAL) ---
-        st.subheader("1. Equipos con más del 60% de su tiempo en Pérdida o Mantenimiento")
+def obtener_calidad(clave, df):
+    return en_cache(("calidad", clave), lambda: calidad.barrido(df), "Validando intervalos...")
 
-        # Agrupar por equipo y frente, sumando horas por GOP
-        horas_por_gop = df_actual.groupby(["Frente", "Código de equipo", "GOP"])["Duracion_h"].sum().reset_index()
-        totales_por_equipo = df_actual.groupby(["Frente", "Código de equipo"])["Duracion_h"].sum().reset_index(name="Total_h")
 
-        # Unir para calcular %
-        horas_por_gop = horas_por_gop.merge(totales_por_equipo, on=["Frente", "Código de equipo"])
-        horas_por_gop["%_GOP"] = (horas_por_gop["Duracion_h"] / horas_por_gop["Total_h"]) * 100
+# --- Detalle por equipo ---
+# Los índices se construyen al cargar el archivo; cada filtro o selección de equipo es una
+# búsqueda en ellos.
+VISTA_DETALLE = "🔎 Detalle por equipo"
+
+
+def obtener_indice(clave, df):
+    return en_cache(("indice", clave), lambda: Indice(df), "Indexando registros...")
+
+
+def detalle_equipos(clave, filtros, sin_fin, umbral, gop_riesgo, indice, df):
+    def calcular():
+        filtrado = indice.registros(df, indice.filtrar(**filtros))
+        horas_gop = calculos.horas_por_gop(calculos.construir_cubo(filtrado), sin_fin)
+        return calculos.tabla_equipos(horas_gop, umbral, gop_riesgo)
+
+    return en_cache(("detalle", clave, repr(sorted(filtros.items())), sin_fin, umbral, tuple(gop_riesgo)), calcular)
+
+
+# --- Caché de agregados ---
+# El cubo se construye una vez por archivo (o periodo del almacén) y cada vista se calcula
+# solo cuando se selecciona.
+def obtener_cubo(clave, df):
+    # Motor de agregación: INDICADORES_MOTOR (pandas, polars o duckdb); todos dan el mismo cubo
+    return en_cache(("cubo", clave), lambda: motores.construir_cubo(df))
+
+
+def cubo_almacen(clave, desde, hasta, almacen):
+    return en_cache(("cubo", clave), lambda: almacen.cubo(desde, hasta), "Consultando almacén...")
+
+
+def obtener_vista(clave, sin_fin, cubo):
+    return en_cache(("vista", clave, sin_fin), lambda: calculos.vista_base(cubo, sin_fin=sin_fin), "Calculando indicadores...")
+
+
+# --- Tendencia por periodo ---
+# Se calcula desde los registros (no desde el cubo) porque cada intervalo se reparte entre los
+# turnos, días o semanas que atraviesa.
+PERIODOS = {"turno": "Turno", "dia": "Día", "semana": "Semana", "hora": "Hora"}
+
+
+def obtener_tendencia(clave, sin_fin, periodo, df):
+    return en_cache(
+        ("tendencia", clave, sin_fin, periodo),
+        lambda: intervalos.tendencia_gop(df, periodo, sin_fin=sin_fin),
+        "Calculando tendencia...",
+    )
+
+
+# --- Parámetros interactivos ---
+# Solo afectan los pasos finales (filtro por umbral y pd.cut), que se recalculan sobre la
+# tabla de % por equipo en caché sin volver a agregar los datos.
+NOMBRES_GOP = {"PERDIDA": "Pérdida", "MANTENIMIENTO": "Mantenimiento", "PRODUCTIVO": "Productivo"}
+
+
+def leer_bins(texto):
+    """Convierte '0,10,...,100' en una lista creciente de límites; None si no es válida."""
+    try:
+        bins = [float(x) for x in texto.replace(";", ",").split(",") if x.strip()]
+    except ValueError:
+        return None
+    if len(bins) < 2 or any(a >= b for a, b in zip(bins[:-1], bins[1:])):
+        return None
+    return bins
+
+
+def parametros_vista(gops_disponibles):
+    st.sidebar.markdown("### ⚙️ Parámetros")
+    umbral = st.sidebar.slider("Umbral de riesgo (% del tiempo)", 0, 100, calculos.UMBRAL_RIESGO, step=5, key="umbral")
+    gop_riesgo = st.sidebar.multiselect(
+        "GOP en riesgo",
+        gops_disponibles,
+        default=[g for g in calculos.GOP_RIESGO if g in gops_disponibles],
+        format_func=lambda g: NOMBRES_GOP.get(g, str(g).capitalize()),
+        key="gop_riesgo",
+    )
+    texto_bins = st.sidebar.text_input(
+        "Límites de los rangos de productividad (%)",
+        ", ".join(f"{b:g}" for b in calculos.BINS),
+        key="bins",
+    )
+    bins = leer_bins(texto_bins)
+    if bins is None:
+        st.sidebar.error("Límites no válidos: use números crecientes separados por comas. Se usan los predeterminados.")
+        bins = calculos.BINS
+    return {"umbral": umbral, "gop_riesgo": gop_riesgo, "bins": bins}
+
 
-        # Filtrar equipos con >60% en Pérdida o Mantenimiento
-        equipos_60 = horas_por_gop[
-            (horas_por_gop["GOP"].isin(["PERDIDA", "MANTENIMIENTO"])) &
-            (horas_por_gop["%_GOP"] > 60)
-        ]
+# ===================================================
+# RENDERIZADO DE UNA VISTA (CON / SIN FIN DE OPERACION)
+# ===================================================
+def mostrar_vista(tablas, ancho_barra, perfil, umbral, gop_riesgo):
+    # --- Gráfico 1: Equipos con >umbral en Pérdida o Mantenimiento (DISEÑO GERENCIAL) ---
+    nombres_riesgo = " o ".join(NOMBRES_GOP.get(g, str(g).capitalize()) for g in gop_riesgo) or "(ningún GOP)"
+    st.subheader(f"1. Equipos con más del {umbral}% de su tiempo en {nombres_riesgo}")
 
-        # Contar equipos por Frente y GOP
-        resumen = equipos_60.groupby(["Frente", "GOP"])["Código de equipo"].count().reset_index(name="Cantidad_Equipos")
+    # Equipos con >umbral en los GOP de riesgo, contados por Frente y GOP
+    resumen = tablas["resumen"]
 
-        # Obtener lista de frentes únicos
-        frentes_unicos = resumen["Frente"].unique()
+    # Obtener lista de frentes únicos
+    frentes_unicos = resumen["Frente"].unique()
 
-        # Crear un gráfico por frente
+    # Crear un gráfico por frente
+    with perfil.etapa("grafico_riesgo"):
         for frente in frentes_unicos:
             subset_frente = resumen[resumen["Frente"] == frente]
 
-            # Configurar figura
-            fig, ax = plt.subplots(figsize=(8, 2))
-            colores = {"PERDIDA": "#e74c3c", "MANTENIMIENTO": "#3498db"}
-
-            # Barras
-            for gop in subset_frente["GOP"].unique():
-                valor = subset_frente[subset_frente["GOP"] == gop]["Cantidad_Equipos"].iloc[0]
-                barra = ax.bar(
-                    gop,
-                    valor,
-                    color=colores[gop],
-                    edgecolor='white',
-                    linewidth=1.5,
-                    width=0.4
-                )
-                # Etiqueta encima de la barra
-                ax.text(
-                    barra[0].get_x() + barra[0].get_width() / 2,
-                    valor + 0.1,
-                    f'{int(valor)}',
-                    ha='center',
-                    va='bottom',
-                    fontsize=12,
-                    fontweight='bold',
-                    color=colores[gop]
-                )
-
-            # Estilo minimalista
-            ax.set_title(f"{frente.upper()}", fontsize=14, fontweight='bold', pad=15, loc='left', color='#2c3e50')
-            ax.set_ylabel("Cantidad de Equipos", fontsize=9, color='#7f8c8d')
-            ax.set_xlabel("")
-            ax.spines['top'].set_visible(False)
-            ax.spines['right'].set_visible(False)
-            ax.spines['left'].set_color('#bdc3c7')
-            ax.spines['bottom'].set_color('#bdc3c7')
-            ax.grid(axis='y', linestyle='--', alpha=0.5, color='#ecf0f1')
-            ax.set_axisbelow(True)
-            ax.set_ylim(0, max(subset_frente["Cantidad_Equipos"]) * 1.2 if not subset_frente.empty else 1)
-
             # KPI resaltado debajo del gráfico
             total_equipos = subset_frente["Cantidad_Equipos"].sum()
             st.markdown(f"<div style='text-align: center; font-size: 16px; font-weight: bold; color: #2c3e50; padding: 12px; "
@@ -151,82 +257,23 @@ if uploaded_file is not None:
                         unsafe_allow_html=True)
 
             # Mostrar gráfico
-            st.pyplot(fig)
+            st.image(graficos.imagen(graficos.figura_riesgo, subset_frente, frente, ancho_barra), width="stretch")
             st.markdown("---")
 
-        # --- Gráfico 2: Top 5 actividades en pérdida (COLOR ROJO) ---
-        st.subheader("2. Top 5 Actividades en Pérdida (% horas)")
-        df_perdida = df_actual[df_actual["GOP"] == "PERDIDA"]
-        resumen_perdida = (
-            df_perdida.groupby(["Frente", "Descripción de la operación"])["Duracion_h"]
-            .sum()
-            .reset_index()
-            .rename(columns={"Descripción de la operación": "Actividad", "Duracion_h": "Horas"})
-        )
-        resumen_perdida["%"] = resumen_perdida.groupby("Frente")["Horas"].transform(lambda x: 100 * x / x.sum())
-        top5 = resumen_perdida.groupby("Frente").apply(
-            lambda x: x.sort_values("%", ascending=False).head(5)
-        ).reset_index(drop=True)
-
-        frentes = top5["Frente"].unique()
-        n_frentes = len(frentes)
-        fig_height = max(5, n_frentes * 3.5)
-        fig, axes = plt.subplots(n_frentes, 1, figsize=(12, fig_height))
-        if n_frentes == 1:
-            axes = [axes]
-
-        for ax, frente in zip(axes, frentes):
-            subset = top5[top5["Frente"] == frente].copy()
-            bars = ax.barh(
-                subset["Actividad"],
-                subset["%"],
-                color="#e74c3c",  # 🔴 ROJO
-                edgecolor='white',
-                linewidth=1.0,
-                height=0.6
-            )
-            ax.set_title(f"{frente.upper()}", fontsize=14, fontweight='bold', pad=15, loc='left', color='#2c3e50')
-            ax.set_xlabel("% de horas perdidas", fontsize=11, color='#7f8c8d')
-            ax.set_ylabel("Actividad", fontsize=11, color='#7f8c8d')
-            ax.invert_yaxis()
-            ax.grid(axis='x', linestyle='--', alpha=0.6, linewidth=0.8, color='#ecf0f1')
-            ax.set_axisbelow(True)
-            ax.spines['top'].set_visible(False)
-            ax.spines['right'].set_visible(False)
-
-            # Etiquetas de valor
-            for bar in bars:
-                width = bar.get_width()
-                ax.text(
-                    width + 0.8,
-                    bar.get_y() + bar.get_height()/2,
-                    f'{width:.1f}%',
-                    va='center',
-                    fontsize=10,
-                    fontweight='bold',
-                    color='#c0392b'
-                )
-
-        plt.tight_layout(pad=3.0)
-        st.pyplot(fig)
-
-        # --- Tabla de Rangos de Productividad ---
-        st.subheader("3. Distribución por Rango de Productividad")
-        totales_equipo = df_actual.groupby(["Frente", "Código de equipo"], as_index=False)["Duracion_h"].sum().rename(columns={"Duracion_h":"Total_h"})
-        horas_equipo = df_actual.groupby(["Frente","Código de equipo","GOP"], as_index=False)["Duracion_h"].sum()
-        horas_equipo = horas_equipo.merge(totales_equipo, on=["Frente","Código de equipo"])
-        horas_equipo["%_GOP"] = (horas_equipo["Duracion_h"] / horas_equipo["Total_h"]) * 100
-
-        bins = [0,10,20,30,40,50,60,100]
-        labels = ["0-10%", "10-20%","20-30%","30-40%","40-50%", "50-60%", "60-100%"]
-        horas_equipo["Rango_Productividad"] = pd.cut(horas_equipo["%_GOP"], bins=bins, labels=labels, include_lowest=True)
-
-        tabla_rangos = horas_equipo.groupby(["Frente","GOP","Rango_Productividad"]).agg(
-            Equipos=("Código de equipo","nunique"),
-            Promedio=("%_GOP","mean")
-        ).reset_index()
-
-        # Mostrar tabla por frente con estilo
+    # --- Gráfico 2: Top 5 actividades en pérdida (COLOR ROJO) ---
+    st.subheader("2. Top 5 Actividades en Pérdida (% horas)")
+    top5 = tablas["top5"]
+
+    if not top5.empty:
+        with perfil.etapa("grafico_top5"):
+            st.image(graficos.imagen(graficos.figura_top5, top5), width="stretch")
+
+    # --- Tabla de Rangos de Productividad ---
+    st.subheader("3. Distribución por Rango de Productividad")
+    tabla_rangos = tablas["tabla_rangos"]
+
+    # Mostrar tabla por frente con estilo
+    with perfil.etapa("tabla_rangos"):
         for frente in tabla_rangos["Frente"].unique():
             tabla = (
                 tabla_rangos[tabla_rangos["Frente"]==frente]
@@ -246,274 +293,354 @@ if uploaded_file is not None:
                 ])
             )
 
-        # --- Gráfico 4: Distribución PRODUCTIVOS (COLOR VERDE) ---
-        st.subheader("4. Equipos Productivos por Rango de Eficiencia")
-        df_prod = tabla_rangos[tabla_rangos["GOP"] == "PRODUCTIVO"]
-        orden = ["0-10%", "10-20%","20-30%","30-40%","40-50%", "50-60%", "60-100%"]
-        df_prod["Rango_Productividad"] = pd.Categorical(df_prod["Rango_Productividad"], categories=orden, ordered=True)
-
-        g = sns.catplot(
-            data=df_prod,
-            x="Rango_Productividad",
-            y="Equipos",
-            kind="bar",
-            col="Frente",
-            col_wrap=2,
-            height=5,
-            aspect=1.2,
-            palette=["#27ae60"] * len(df_prod),  # 🟩 VERDE
-            edgecolor='white',
-            linewidth=1.2
+    # --- Gráfico 4: Distribución PRODUCTIVOS (COLOR VERDE) ---
+    st.subheader("4. Equipos Productivos por Rango de Eficiencia")
+    df_prod = tabla_rangos[tabla_rangos["GOP"] == "PRODUCTIVO"]
+    if not df_prod.empty:
+        with perfil.etapa("grafico_productivos"):
+            st.image(graficos.imagen(graficos.figura_productivos, df_prod), width="stretch")
+
+
+# ===================================================
+# REPORTE EJECUTIVO (EXCEL, EN SEGUNDO PLANO)
+# ===================================================
+def imagenes_vista(tablas, ancho_barra):
+    """(título, PNG) de cada gráfico de una vista; salen de la caché de imágenes si ya se dibujaron."""
+    imagenes = [
+        (f"Equipos en riesgo operativo - {frente}", graficos.imagen(graficos.figura_riesgo, subset, frente, ancho_barra))
+        for frente, subset in tablas["resumen"].groupby("Frente", observed=True)
+    ]
+    if not tablas["top5"].empty:
+        imagenes.append(("Top 5 actividades en pérdida", graficos.imagen(graficos.figura_top5, tablas["top5"])))
+    df_prod = tablas["tabla_rangos"][tablas["tabla_rangos"]["GOP"] == "PRODUCTIVO"]
+    if not df_prod.empty:
+        imagenes.append(("Equipos productivos por rango", graficos.imagen(graficos.figura_productivos, df_prod)))
+    return imagenes
+
+
+def contenido_reporte(clave, cubo, parametros, origen):
+    """Tablas y gráficos de ambas vistas para ``reporte.generar_excel``.
+
+    Los gráficos se dibujan aquí (matplotlib no es seguro entre hilos); el hilo del reporte
+    solo escribe el libro.
+    """
+    vistas = {}
+    for titulo, sin_fin, ancho_barra in VISTAS.values():
+        tablas = calculos.completar_vista(obtener_vista(clave, sin_fin, cubo), **parametros)
+        tablas["equipos"] = calculos.tabla_equipos(tablas["horas_gop"], parametros["umbral"], parametros["gop_riesgo"])
+        vistas["SIN fin" if sin_fin else "CON fin"] = {
+            "titulo": titulo,
+            "tablas": tablas,
+            "imagenes": imagenes_vista(tablas, ancho_barra),
+        }
+    descripcion = {
+        "Origen de los datos": origen,
+        "Umbral de riesgo (% del tiempo)": parametros["umbral"],
+        "GOP en riesgo": ", ".join(map(str, parametros["gop_riesgo"])),
+        "Límites de los rangos (%)": ", ".join(f"{b:g}" for b in parametros["bins"]),
+    }
+    return "Dashboard Ejecutivo - Productividad de Equipos", descripcion, vistas
+
+
+@st.fragment(run_every=1)
+def esperar_reporte():
+    # Solo se vuelve a ejecutar este fragmento mientras el reporte se genera
+    if st.session_state["reporte"]["futuro"].done():
+        st.rerun()
+    st.caption("⏳ Generando reporte en segundo plano...")
+
+
+def panel_reporte(clave, cubo, parametros, origen):
+    st.sidebar.markdown("### 📑 Reporte ejecutivo")
+    clave_reporte = (clave, repr(parametros))
+    pedido = st.session_state.get("reporte")
+    if pedido is not None and pedido["clave"] != clave_reporte:
+        # Cambiaron los datos o los parámetros: el reporte anterior ya no corresponde
+        pedido = None
+
+    if st.sidebar.button("Generar reporte Excel", key="generar_reporte"):
+        with st.spinner("Preparando gráficos del reporte..."):
+            contenido = contenido_reporte(clave, cubo, parametros, origen)
+        pedido = {"clave": clave_reporte, "futuro": reporte.en_segundo_plano(*contenido)}
+        st.session_state["reporte"] = pedido
+
+    if pedido is None:
+        return
+    futuro = pedido["futuro"]
+    if not futuro.done():
+        with st.sidebar:
+            esperar_reporte()
+    elif futuro.exception() is not None:
+        st.sidebar.error(f"❌ No se pudo generar el reporte: {futuro.exception()}")
+    else:
+        st.sidebar.download_button(
+            "⬇️ Descargar reporte",
+            futuro.result(),
+            file_name="reporte_indicadores.xlsx",
+            mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+            key="descargar_reporte",
         )
-        g.set_titles("{col_name}", size=13, weight='bold', color='#2c3e50')
-        g.set_axis_labels("Rango de Productividad", "Número de Equipos", size=11, color='#7f8c8d')
-        g.set_xticklabels(rotation=45, size=10)
-
-        # Agregar etiquetas en cada subplot
-        for ax in g.axes.flat:
-            for bar in ax.patches:
-                height = bar.get_height()
-                if height > 0:
-                    ax.text(
-                        bar.get_x() + bar.get_width() / 2,
-                        height + 0.2,
-                        f'{int(height)}',
-                        ha='center',
-                        va='bottom',
-                        fontsize=10,
-                        fontweight='bold',
-                        color='#2c3e50'
-                    )
-            ax.grid(axis='y', linestyle='--', alpha=0.6, linewidth=0.8, color='#ecf0f1')
-            ax.set_axisbelow(True)
-            ax.spines['top'].set_visible(False)
-            ax.spines['right'].set_visible(False)
-
-        plt.tight_layout()
-        st.pyplot(g)
-
-    # ===================================================
-    # PESTAÑA 2: SIN FIN DE OPERACION
-    # ===================================================
-    with tab2:
-        st.header("📉 Análisis SIN 'FIN DE OPERACION DE LA MAQUINA'")
-        df_actual = df_sin_fin.copy()
-
-        # --- Gráfico 1: Equipos con >60% en Pérdida o Mantenimiento (DISEÑO GERENCIAL) ---
-        st.subheader("1. Equipos con más del 60% de su tiempo en Pérdida o Mantenimiento")
-
-        # Agrupar por equipo y frente, sumando horas por GOP
-        horas_por_gop = df_actual.groupby(["Frente", "Código de equipo", "GOP"])["Duracion_h"].sum().reset_index()
-        totales_por_equipo = df_actual.groupby(["Frente", "Código de equipo"])["Duracion_h"].sum().reset_index(name="Total_h")
-
-        # Unir para calcular %
-        horas_por_gop = horas_por_gop.merge(totales_por_equipo, on=["Frente", "Código de equipo"])
-        horas_por_gop["%_GOP"] = (horas_por_gop["Duracion_h"] / horas_por_gop["Total_h"]) * 100
-
-        # Filtrar equipos con >60% en Pérdida o Mantenimiento
-        equipos_60 = horas_por_gop[
-            (horas_por_gop["GOP"].isin(["PERDIDA", "MANTENIMIENTO"])) &
-            (horas_por_gop["%_GOP"] > 60)
-        ]
-
-        # Contar equipos por Frente y GOP
-        resumen = equipos_60.groupby(["Frente", "GOP"])["Código de equipo"].count().reset_index(name="Cantidad_Equipos")
-
-        # Obtener lista de frentes únicos
-        frentes_unicos = resumen["Frente"].unique()
-
-        # Crear un gráfico por frente
-        for frente in frentes_unicos:
-            subset_frente = resumen[resumen["Frente"] == frente]
 
-            # Configurar figura
-            fig, ax = plt.subplots(figsize=(8, 2))
-            colores = {"PERDIDA": "#e74c3c", "MANTENIMIENTO": "#3498db"}
-
-            # Barras
-            for gop in subset_frente["GOP"].unique():
-                valor = subset_frente[subset_frente["GOP"] == gop]["Cantidad_Equipos"].iloc[0]
-                barra = ax.bar(
-                    gop,
-                    valor,
-                    color=colores[gop],
-                    edgecolor='white',
-                    linewidth=1.5,
-                    width=0.6
-                )
-                # Etiqueta encima de la barra
-                ax.text(
-                    barra[0].get_x() + barra[0].get_width() / 2,
-                    valor + 0.1,
-                    f'{int(valor)}',
-                    ha='center',
-                    va='bottom',
-                    fontsize=12,
-                    fontweight='bold',
-                    color=colores[gop]
-                )
-
-            # Estilo minimalista
-            ax.set_title(f"{frente.upper()}", fontsize=14, fontweight='bold', pad=15, loc='left', color='#2c3e50')
-            ax.set_ylabel("Cantidad de Equipos", fontsize=9, color='#7f8c8d')
-            ax.set_xlabel("")
-            ax.spines['top'].set_visible(False)
-            ax.spines['right'].set_visible(False)
-            ax.spines['left'].set_color('#bdc3c7')
-            ax.spines['bottom'].set_color('#bdc3c7')
-            ax.grid(axis='y', linestyle='--', alpha=0.5, color='#ecf0f1')
-            ax.set_axisbelow(True)
-            ax.set_ylim(0, max(subset_frente["Cantidad_Equipos"]) * 1.2 if not subset_frente.empty else 1)
 
-            # KPI resaltado debajo del gráfico
-            total_equipos = subset_frente["Cantidad_Equipos"].sum()
-            st.markdown(f"<div style='text-align: center; font-size: 16px; font-weight: bold; color: #2c3e50; padding: 12px; "
-                        f"background-color: #f8f9fa; border-left: 4px solid #e67e22; border-radius: 0 8px 8px 0; margin: 10px 0;'>"
-                        f"⚠️ Equipos en riesgo operativo: <span style='color: #e67e22; font-size: 18px;'>{int(total_equipos)}</span></div>",
-                        unsafe_allow_html=True)
+# ===================================================
+# MODO EN VIVO
+# ===================================================
+@st.fragment(run_every=vivo.INTERVALO_S)
+def panel_vivo(seguimiento, sin_fin, ancho_barra, parametros):
+    # Solo este fragmento se vuelve a ejecutar en cada intervalo. Se leen únicamente las filas
+    # nuevas y los gráficos cuyos datos no cambiaron salen de la caché de imágenes.
+    with perfil.etapa("vivo_actualizar"):
+        nuevas = seguimiento.actualizar()
+    cubo, version = seguimiento.estado()
+    st.caption(
+        f"📡 {seguimiento.registros():,} registros · actualizado a las {seguimiento.actualizado:%H:%M:%S}"
+        + (f" · {nuevas:,} filas nuevas" if nuevas else "")
+    )
+    for ruta, error in seguimiento.errores.items():
+        st.warning(f"No se pudo leer {os.path.basename(ruta)}: {error}")
+    if cubo is None:
+        return
+
+    clave = f"vivo:{seguimiento.ruta}:{version}"
+    with perfil.etapa("indicadores"):
+        base = obtener_vista(clave, sin_fin, cubo)
+    with perfil.etapa("umbral_y_rangos"):
+        tablas = calculos.completar_vista(base, **parametros)
+    mostrar_vista(tablas, ancho_barra, perfil, parametros["umbral"], parametros["gop_riesgo"])
+
+
+@st.fragment(run_every=vivo.INTERVALO_S)
+def esperar_datos_vivo(seguimiento):
+    if seguimiento.actualizar():
+        st.rerun()
+    st.info(f"📡 Esperando datos en {seguimiento.ruta}...")
+
+
+# ===================================================
+# CALIDAD DE DATOS
+# ===================================================
+def mostrar_calidad(df, marcas, perfil):
+    st.header(VISTA_CALIDAD)
+    totales = calidad.resumen(marcas)
+    col1, col2, col3, col4 = st.columns(4)
+    col1.metric("Registros solapados", f"{totales['solapes']:,}")
+    col2.metric("Horas contadas dos veces", f"{totales['horas_solapadas']:,.1f}")
+    col3.metric(f"Huecos de {calidad.HUECO_MIN:g} min o más", f"{totales['huecos']:,}")
+    col4.metric("Horas sin registro", f"{totales['horas_huecos']:,.1f}")
+    if totales["sin_validar"]:
+        st.caption(f"{totales['sin_validar']:,} registros sin equipo, sin fechas o con fin anterior al inicio no se validaron.")
+
+    with perfil.etapa("tablas_calidad"):
+        st.subheader("Equipos con solapes o huecos")
+        st.dataframe(calidad.por_equipo(df, marcas), hide_index=True)
+
+        if totales["solapes"]:
+            st.subheader("Registros solapados")
+            st.caption("Horas de cada registro que ya estaban cubiertas por otro registro del mismo equipo (se muestran hasta 1.000).")
+            st.dataframe(calidad.solapados(df, marcas), hide_index=True)
+
+
+# ===================================================
+# DETALLE POR EQUIPO
+# ===================================================
+def mostrar_detalle(indice, df, clave, perfil, umbral, gop_riesgo):
+    st.header(VISTA_DETALLE)
+
+    # --- Filtros ---
+    col1, col2, col3, col4 = st.columns(4)
+    frentes = col1.multiselect("Frente", list(df[calculos.FRENTE].cat.categories), key="detalle_frentes")
+    primera, ultima = df["Hora de inicio"].min().date(), df["Hora de inicio"].max().date()
+    periodo = col2.date_input(
+        "Periodo", value=(primera, ultima), min_value=primera, max_value=ultima, key="detalle_periodo"
+    )
+    gops = col3.multiselect(
+        "GOP",
+        list(df[calculos.GOP].cat.categories),
+        format_func=lambda g: NOMBRES_GOP.get(g, str(g).capitalize()),
+        key="detalle_gops",
+    )
+    operaciones = col4.multiselect("Operación", list(df[calculos.OPERACION].cat.categories), key="detalle_operaciones")
+    sin_fin = st.toggle(f"Excluir '{calculos.FIN_OPERACION}'", key="detalle_sin_fin")
+
+    desde, hasta = periodo if len(periodo) == 2 else (periodo[0], periodo[0])
+    filtros = {
+        "frentes": frentes or None,
+        "desde": desde,
+        "hasta": hasta,
+        "gops": gops or None,
+        "operaciones": operaciones or None,
+    }
+
+    # --- Equipos que cumplen los filtros ---
+    with perfil.etapa("detalle_equipos"):
+        equipos = detalle_equipos(clave, filtros, sin_fin, umbral, tuple(gop_riesgo), indice, df)
+    st.markdown(f"<div style='text-align: center; font-size: 16px; font-weight: bold; color: #2c3e50; padding: 12px; "
+                f"background-color: #f8f9fa; border-left: 4px solid #e67e22; border-radius: 0 8px 8px 0; margin: 10px 0;'>"
+                f"⚠️ Equipos en riesgo operativo: <span style='color: #e67e22; font-size: 18px;'>{int(equipos['En riesgo'].sum())}</span>"
+                f" de {len(equipos)}</div>",
+                unsafe_allow_html=True)
+    if st.checkbox("Solo equipos en riesgo", key="detalle_solo_riesgo"):
+        equipos = equipos[equipos["En riesgo"]]
+    st.dataframe(equipos.round(1), hide_index=True)
+    if equipos.empty:
+        st.info("Ningún equipo cumple los filtros.")
+        return
+
+    # --- Línea de tiempo del equipo elegido ---
+    equipo = st.selectbox("Equipo", list(equipos[calculos.EQUIPO]), key="detalle_equipo")
+    with perfil.etapa("detalle_linea_tiempo"):
+        registros = indice.registros(df, indice.de_equipo(equipo, indice.filtrar(**filtros)))
+        if sin_fin:
+            registros = registros[registros[calculos.OPERACION] != calculos.FIN_OPERACION]
+        if not registros.empty:
+            st.image(
+                graficos.imagen(
+                    graficos.figura_linea_tiempo,
+                    registros[["Hora de inicio", "Hora de finalización", calculos.GOP]],
+                    equipo,
+                ),
+                width="stretch",
+            )
+        st.dataframe(
+            registros[[calculos.OPERACION, calculos.GOP, "Hora de inicio", "Hora de finalización", "Duracion_h"]],
+            hide_index=True,
+        )
 
-            # Mostrar gráfico
-            st.pyplot(fig)
-            st.markdown("---")
 
-        # --- Gráfico 2: Top 5 actividades en pérdida (COLOR ROJO) ---
-        st.subheader("2. Top 5 Actividades en Pérdida (% horas)")
-        df_perdida = df_actual[df_actual["GOP"] == "PERDIDA"]
-        resumen_perdida = (
-            df_perdida.groupby(["Frente", "Descripción de la operación"])["Duracion_h"]
-            .sum()
-            .reset_index()
-            .rename(columns={"Descripción de la operación": "Actividad", "Duracion_h": "Horas"})
+clave = cubo = indice = origen = None
+
+if fuente == FUENTE_ALMACEN:
+    # --- Periodo consultado en el almacén (por defecto: mes a la fecha) ---
+    primera, ultima = almacen.rango_fechas()
+    if primera is None:
+        st.warning("🗄️ El almacén está vacío: sube un archivo para empezar a acumular historia.")
+    else:
+        primera, ultima = date.fromisoformat(primera), date.fromisoformat(ultima)
+        periodo = st.sidebar.date_input(
+            "Periodo",
+            value=(max(primera, ultima.replace(day=1)), ultima),
+            min_value=primera,
+            max_value=ultima,
+            key="periodo",
         )
-        resumen_perdida["%"] = resumen_perdida.groupby("Frente")["Horas"].transform(lambda x: 100 * x / x.sum())
-        top5 = resumen_perdida.groupby("Frente").apply(
-            lambda x: x.sort_values("%", ascending=False).head(5)
-        ).reset_index(drop=True)
-
-        frentes = top5["Frente"].unique()
-        n_frentes = len(frentes)
-        fig_height = max(5, n_frentes * 3.5)
-        fig, axes = plt.subplots(n_frentes, 1, figsize=(12, fig_height))
-        if n_frentes == 1:
-            axes = [axes]
-
-        for ax, frente in zip(axes, frentes):
-            subset = top5[top5["Frente"] == frente].copy()
-            bars = ax.barh(
-                subset["Actividad"],
-                subset["%"],
-                color="#e74c3c",  # 🔴 ROJO
-                edgecolor='white',
-                linewidth=1.0,
-                height=0.6
-            )
-            ax.set_title(f"{frente.upper()}", fontsize=14, fontweight='bold', pad=15, loc='left', color='#2c3e50')
-            ax.set_xlabel("% de horas perdidas", fontsize=11, color='#7f8c8d')
-            ax.set_ylabel("Actividad", fontsize=11, color='#7f8c8d')
-            ax.invert_yaxis()
-            ax.grid(axis='x', linestyle='--', alpha=0.6, linewidth=0.8, color='#ecf0f1')
-            ax.set_axisbelow(True)
-            ax.spines['top'].set_visible(False)
-            ax.spines['right'].set_visible(False)
-
-            # Etiquetas de valor
-            for bar in bars:
-                width = bar.get_width()
-                ax.text(
-                    width + 0.8,
-                    bar.get_y() + bar.get_height()/2,
-                    f'{width:.1f}%',
-                    va='center',
-                    fontsize=10,
-                    fontweight='bold',
-                    color='#c0392b'
-                )
-
-        plt.tight_layout(pad=3.0)
-        st.pyplot(fig)
-
-        # --- Tabla de Rangos de Productividad ---
-        st.subheader("3. Distribución por Rango de Productividad")
-        totales_equipo = df_actual.groupby(["Frente", "Código de equipo"], as_index=False)["Duracion_h"].sum().rename(columns={"Duracion_h":"Total_h"})
-        horas_equipo = df_actual.groupby(["Frente","Código de equipo","GOP"], as_index=False)["Duracion_h"].sum()
-        horas_equipo = horas_equipo.merge(totales_equipo, on=["Frente","Código de equipo"])
-        horas_equipo["%_GOP"] = (horas_equipo["Duracion_h"] / horas_equipo["Total_h"]) * 100
-
-        bins = [0,10,20,30,40,50,60,100]
-        labels = ["0-10%", "10-20%","20-30%","30-40%","40-50%", "50-60%", "60-100%"]
-        horas_equipo["Rango_Productividad"] = pd.cut(horas_equipo["%_GOP"], bins=bins, labels=labels, include_lowest=True)
-
-        tabla_rangos = horas_equipo.groupby(["Frente","GOP","Rango_Productividad"]).agg(
-            Equipos=("Código de equipo","nunique"),
-            Promedio=("%_GOP","mean")
-        ).reset_index()
-
-        # Mostrar tabla por frente con estilo
-        for frente in tabla_rangos["Frente"].unique():
-            tabla = (
-                tabla_rangos[tabla_rangos["Frente"]==frente]
-                .pivot(index="GOP", columns="Rango_Productividad", values="Equipos")
-                .fillna(0)
-                .astype(int)
-            )
-            st.markdown(f"### {frente.upper()}")
-            st.dataframe(
-                tabla.style
-                .background_gradient(cmap="Blues", axis=None)
-                .format("{:.0f}")
-                .set_properties(**{'text-align': 'center', 'font-weight': 'bold'})
-                .set_table_styles([
-                    {'selector': 'th', 'props': [('background-color', '#f1f3f6'), ('color', '#2c3e50')]},
-                    {'selector': 'td', 'props': [('border', '1px solid #e0e0e0')]}
-                ])
+        if len(periodo) == 2:
+            desde, hasta = periodo
+            clave = f"almacen:{desde}:{hasta}:{almacen.version()}"
+            with perfil.etapa("cubo_almacen"):
+                cubo = cubo_almacen(clave, desde, hasta, almacen)
+            origen = f"Almacén local, del {desde:%d/%m/%Y} al {hasta:%d/%m/%Y}"
+            st.caption(f"🗄️ {origen}")
+
+elif fuente == FUENTE_VIVO:
+    # Primera lectura en la ejecución completa; después el fragmento del panel se refresca solo
+    with perfil.etapa("vivo_actualizar"):
+        seguimiento.actualizar()
+    cubo, version = seguimiento.estado()
+    if cubo is None:
+        esperar_datos_vivo(seguimiento)
+    else:
+        clave = f"vivo:{seguimiento.ruta}:{version}"
+        origen = f"En vivo: {seguimiento.ruta}"
+
+elif uploaded_file is not None:
+    # Cargar datos (normalizados: incluye 'Frente', 'Duracion_h' y 'GOP')
+    with perfil.etapa("huella"):
+        clave = huella_subida(uploaded_file)
+        origen = uploaded_file.name
+    try:
+        df = cargar_datos(clave, uploaded_file, perfil)
+    except ValueError as e:
+        st.error(f"❌ No se pudo leer el archivo: {e}")
+        st.stop()
+    memoria = df.attrs.get("memoria_mb")
+    if memoria:
+        st.caption(f"💾 Memoria de los datos: {memoria['antes']:.1f} MB → {memoria['despues']:.1f} MB tras normalizar")
+
+    # --- Carga incremental al almacén (una sola vez por contenido) ---
+    if almacen and not almacen.contiene(clave):
+        with perfil.etapa("agregar_almacen"), st.spinner("Agregando al almacén local..."):
+            nuevas = almacen.agregar(df, clave, uploaded_file.name)
+        st.sidebar.success(f"🗄️ {nuevas:,} filas nuevas agregadas al almacén")
+
+    with perfil.etapa("calidad"):
+        marcas = obtener_calidad(clave, df)
+    solapes = int((marcas["Solape_h"] > 0).sum())
+    df_analisis = df
+    if solapes:
+        st.caption(f"⚠️ {solapes:,} registros se solapan con otros del mismo equipo: ver '{VISTA_CALIDAD}'")
+        if st.sidebar.checkbox("✂️ Recortar solapes antes de agregar", key="recortar"):
+            df_analisis = calidad.recortar(df, marcas)
+            clave = f"{clave}:recortado"
+            origen = f"{origen} (solapes recortados)"
+
+    with perfil.etapa("cubo"):
+        cubo = obtener_cubo(clave, df_analisis)
+    with perfil.etapa("indice"):
+        indice = obtener_indice(clave, df_analisis)
+
+if cubo is not None:
+    # --- Selector de vista ---
+    # Solo se calcula y dibuja la vista elegida; la otra se calcula cuando se pide y queda en caché.
+    vista = st.radio(
+        "Vista",
+        list(VISTAS) + ([VISTA_DETALLE, VISTA_CALIDAD] if fuente == FUENTE_ARCHIVO else []),
+        horizontal=True,
+        label_visibility="collapsed",
+        key="vista",
+    )
+    if vista == VISTA_CALIDAD:
+        mostrar_calidad(df, marcas, perfil)
+    elif vista == VISTA_DETALLE:
+        parametros = parametros_vista(list(df_analisis[calculos.GOP].cat.categories))
+        mostrar_detalle(indice, df_analisis, clave, perfil, parametros["umbral"], parametros["gop_riesgo"])
+    else:
+        titulo, sin_fin, ancho_barra = VISTAS[vista]
+        st.header(titulo)
+        with perfil.etapa("indicadores"):
+            base = obtener_vista(clave, sin_fin, cubo)
+        parametros = parametros_vista(list(base["horas_gop"]["GOP"].cat.categories))
+        if fuente == FUENTE_VIVO:
+            panel_vivo(seguimiento, sin_fin, ancho_barra, parametros)
+        else:
+            with perfil.etapa("umbral_y_rangos"):
+                tablas = calculos.completar_vista(base, **parametros)
+            mostrar_vista(tablas, ancho_barra, perfil, parametros["umbral"], parametros["gop_riesgo"])
+        panel_reporte(clave, cubo, parametros, origen)
+
+        # --- Gráfico 5: % de horas por GOP en cada turno / día / semana ---
+        st.subheader("5. Tendencia por Periodo")
+        if fuente == FUENTE_ARCHIVO:
+            periodo_tendencia = st.selectbox(
+                "Periodo", list(PERIODOS), format_func=PERIODOS.get, index=1, key="periodo_tendencia"
             )
-
-        # --- Gráfico 4: Distribución PRODUCTIVOS (COLOR VERDE) ---
-        st.subheader("4. Equipos Productivos por Rango de Eficiencia")
-        df_prod = tabla_rangos[tabla_rangos["GOP"] == "PRODUCTIVO"]
-        orden = ["0-10%", "10-20%","20-30%","30-40%","40-50%", "50-60%", "60-100%"]
-        df_prod["Rango_Productividad"] = pd.Categorical(df_prod["Rango_Productividad"], categories=orden, ordered=True)
-
-        g = sns.catplot(
-            data=df_prod,
-            x="Rango_Productividad",
-            y="Equipos",
-            kind="bar",
-            col="Frente",
-            col_wrap=2,
-            height=5,
-            aspect=1.2,
-            palette=["#27ae60"] * len(df_prod),  # 🟩 VERDE
-            edgecolor='white',
-            linewidth=1.2
+            with perfil.etapa("tendencia"):
+                tendencia = obtener_tendencia(clave, sin_fin, periodo_tendencia, df_analisis)
+                if not tendencia.empty:
+                    st.image(graficos.imagen(graficos.figura_tendencia, tendencia), width="stretch")
+        else:
+            st.caption("La tendencia por periodo está disponible al analizar un archivo subido.")
+
+    # Figuras de matplotlib aún abiertas tras el render (debe ser 0; sirve para detectar fugas)
+    st.sidebar.caption(f"🖼️ Figuras abiertas: {graficos.figuras_vivas()}")
+
+    # --- Estado de la caché compartida ---
+    estadisticas = compartida.estadisticas()
+    with st.sidebar.expander(
+        f"🧠 Caché compartida: {estadisticas['ocupado_mb']:,.0f} de {estadisticas['memoria_mb']:,.0f} MB"
+    ):
+        st.caption(
+            f"{estadisticas['entradas']} entradas · {estadisticas['aciertos']:,} aciertos · "
+            f"{estadisticas['fallos']:,} fallos ({estadisticas['tasa_aciertos']:.0%} aciertos) · "
+            f"{estadisticas['descartes']:,} descartadas"
         )
-        g.set_titles("{col_name}", size=13, weight='bold', color='#2c3e50')
-        g.set_axis_labels("Rango de Productividad", "Número de Equipos", size=11, color='#7f8c8d')
-        g.set_xticklabels(rotation=45, size=10)
-
-        # Agregar etiquetas en cada subplot
-        for ax in g.axes.flat:
-            for bar in ax.patches:
-                height = bar.get_height()
-                if height > 0:
-                    ax.text(
-                        bar.get_x() + bar.get_width() / 2,
-                        height + 0.2,
-                        f'{int(height)}',
-                        ha='center',
-                        va='bottom',
-                        fontsize=10,
-                        fontweight='bold',
-                        color='#2c3e50'
-                    )
-            ax.grid(axis='y', linestyle='--', alpha=0.6, linewidth=0.8, color='#ecf0f1')
-            ax.set_axisbelow(True)
-            ax.spines['top'].set_visible(False)
-            ax.spines['right'].set_visible(False)
-
-        plt.tight_layout()
-        st.pyplot(g)
-
-else:
-    st.info("👆 Por favor, sube un archivo Excel para comenzar el análisis ejecutivo.")
-    st.image("https://www.manuelita.com/wp-content/uploads/2017/01/Logo-manuelita.jpg", width=400)
\ No newline at end of file
+
+    # --- Panel de perfilado ---
+    if perfil.activo:
+        with st.sidebar.expander("⏱️ Perfil de la ejecución", expanded=True):
+            st.dataframe(pd.DataFrame(perfil.etapas), hide_index=True)
+            st.caption(f"Total medido: {perfil.total():.2f} s")
+            st.download_button("⬇️ Exportar JSON", perfil.a_json(), file_name="perfil.json", mime="application/json")
+
+elif fuente == FUENTE_ARCHIVO:
+    st.info("👆 Por favor, sube un archivo Excel, CSV, Parquet o Arrow para comenzar el análisis ejecutivo.")
+    st.image(RUTA_LOGO if os.path.exists(RUTA_LOGO) else URL_LOGO, width=400)
\ No newline at end of file
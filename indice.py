@@ -0,0 +1,95 @@
+"""Índices del DataFrame normalizado para el detalle por equipo.
+
+Se construyen una vez por archivo. Los registros se ordenan por (equipo, Hora de inicio) y
+se trabaja con su posición en ese orden: la línea de tiempo de un equipo es un tramo
+contiguo, y cada filtro (frente, GOP, operación, fechas) devuelve sus posiciones desde un
+índice precalculado, sin evaluar una máscara sobre todas las filas. El índice no guarda el
+DataFrame: quien lo usa pasa el mismo con el que se construyó.
+"""
+import numpy as np
+import pandas as pd
+
+import calculos
+import intervalos
+
+# Columnas categóricas con índice valor -> posiciones
+COLUMNAS_INDICE = [calculos.FRENTE, calculos.GOP, calculos.OPERACION]
+
+
+class _Grupos:
+    """Posiciones de cada categoría de una columna, agrupadas por código (en orden creciente)."""
+
+    def __init__(self, codigos, categorias):
+        self.categorias = categorias
+        # Código + 1 para que los nulos (-1) queden en el grupo 0
+        # (en el tipo entero más chico posible: argsort estable usa radix sort para 8 y 16 bits)
+        codigos = (np.asarray(codigos, dtype="int64") + 1).astype(np.min_scalar_type(len(categorias) + 1))
+        self.posiciones = np.argsort(codigos, kind="stable")
+        self.limites = np.searchsorted(codigos[self.posiciones], np.arange(len(categorias) + 2))
+
+    def de_codigo(self, codigo):
+        return self.posiciones[self.limites[codigo + 1]:self.limites[codigo + 2]]
+
+    def de_valores(self, valores):
+        """Posiciones (ordenadas) de los registros cuyo valor está en ``valores``."""
+        codigos = self.categorias.get_indexer(list(valores))
+        partes = [self.de_codigo(c) for c in codigos if c >= 0]
+        if not partes:
+            return np.zeros(0, dtype=np.intp)
+        return partes[0] if len(partes) == 1 else np.sort(np.concatenate(partes))
+
+
+class Indice:
+    """Registros ordenados por (equipo, inicio) e índices para filtrarlos."""
+
+    def __init__(self, df):
+        equipo = df[calculos.EQUIPO].cat.codes.to_numpy()
+        # Los registros sin hora de inicio (NaT) quedan al principio de su equipo
+        inicio, _ = intervalos.a_ns(df["Hora de inicio"])
+        self.orden = intervalos.ordenar_por_equipo(equipo, inicio)
+
+        self._equipos = _Grupos(equipo[self.orden], df[calculos.EQUIPO].cat.categories)
+        inicio = inicio[self.orden]
+        self._por_fecha = np.argsort(inicio, kind="stable")
+        self._fechas = inicio[self._por_fecha]
+        self._grupos = {
+            col: _Grupos(df[col].cat.codes.to_numpy()[self.orden], df[col].cat.categories)
+            for col in COLUMNAS_INDICE
+        }
+
+    def __len__(self):
+        return len(self.orden)
+
+    def filtrar(self, frentes=None, desde=None, hasta=None, gops=None, operaciones=None):
+        """Posiciones de los registros que cumplen todos los filtros (None = sin filtro).
+
+        ``desde`` y ``hasta`` son fechas inclusive sobre 'Hora de inicio'. Las posiciones
+        quedan ordenadas, es decir, por equipo y hora de inicio.
+        """
+        seleccion = None
+        if desde is not None or hasta is not None:
+            a = 0 if desde is None else np.searchsorted(self._fechas, pd.Timestamp(desde).value)
+            b = len(self) if hasta is None else np.searchsorted(
+                self._fechas, (pd.Timestamp(hasta) + pd.Timedelta(days=1)).value
+            )
+            seleccion = np.sort(self._por_fecha[a:b])
+
+        for col, valores in [(calculos.FRENTE, frentes), (calculos.GOP, gops), (calculos.OPERACION, operaciones)]:
+            if valores is None:
+                continue
+            posiciones = self._grupos[col].de_valores(valores)
+            seleccion = posiciones if seleccion is None else np.intersect1d(seleccion, posiciones, assume_unique=True)
+
+        return np.arange(len(self)) if seleccion is None else seleccion
+
+    def de_equipo(self, equipo, posiciones):
+        """Las ``posiciones`` (ordenadas) que pertenecen a ``equipo``: dos búsquedas binarias."""
+        codigo = self._equipos.categorias.get_loc(equipo)
+        tramo = self._equipos.de_codigo(codigo)
+        if not len(tramo):
+            return tramo
+        return posiciones[np.searchsorted(posiciones, tramo[0]):np.searchsorted(posiciones, tramo[-1] + 1)]
+
+    def registros(self, df, posiciones):
+        """Filas de ``df`` (el DataFrame del índice) en esas posiciones, por equipo y hora de inicio."""
+        return df.take(self.orden[posiciones])
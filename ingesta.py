@@ -0,0 +1,344 @@
+import hashlib
+import os
+from io import BytesIO
+from itertools import islice
+from operator import itemgetter
+
+import numpy as np
+import pandas as pd
+from pandas.api.types import union_categoricals
+
+from perfil import SIN_PERFIL
+
+# ==========================================
+# CONFIGURACIÓN DE INGESTA
+# ==========================================
+# Directorio opcional para guardar una copia columnar (Parquet) de cada archivo ya procesado.
+# Si no se define, la caché vive solo en memoria.
+DIR_CACHE = os.environ.get("INDICADORES_CACHE_DIR")
+
+# Formato de 'Hora de inicio' / 'Hora de finalización' cuando llegan como texto
+FORMATO_FECHA = os.environ.get("INDICADORES_FORMATO_FECHA", "%Y-%m-%d %H:%M:%S")
+
+# Columnas de texto con pocos valores distintos: se guardan como categóricas
+COLUMNAS_CATEGORICAS = [
+    "Descripción del grupo de equipos",
+    "Código de equipo",
+    "Descripción del grupo de operaciones",
+    "Descripción de la operación",
+]
+COLUMNAS_FECHA = ["Hora de inicio", "Hora de finalización"]
+
+# Únicas columnas que usa el pipeline; los lectores no cargan las demás
+COLUMNAS_ENTRADA = COLUMNAS_CATEGORICAS + COLUMNAS_FECHA
+
+# Extensión -> formato de lectura
+FORMATOS = {
+    ".xlsx": "excel",
+    ".csv": "csv",
+    ".parquet": "parquet",
+    ".arrow": "arrow",
+    ".feather": "arrow",
+}
+EXTENSIONES = [ext.lstrip(".") for ext in FORMATOS]
+
+# Los Excel más grandes que este tamaño se leen en streaming, por bloques de filas
+UMBRAL_STREAMING_MB = float(os.environ.get("INDICADORES_UMBRAL_STREAMING_MB", "10"))
+FILAS_POR_BLOQUE = 50_000
+
+
+def huella(contenido):
+    """Hash SHA-256 del contenido del archivo; identifica el archivo sin importar su nombre."""
+    return hashlib.sha256(contenido).hexdigest()
+
+
+def normalizar(df, formato_fecha=FORMATO_FECHA):
+    """Agrega las columnas derivadas 'Frente', 'Duracion_h' y 'GOP' con operaciones vectorizadas.
+
+    Las columnas de texto de baja cardinalidad se guardan como categóricas, de modo que los
+    groupby posteriores trabajan sobre códigos enteros. El uso de memoria antes y después
+    queda en ``df.attrs["memoria_mb"]``.
+    """
+    memoria_antes = uso_memoria_mb(df)
+
+    # --- Texto de baja cardinalidad como categórico ---
+    for col in COLUMNAS_CATEGORICAS:
+        df[col] = df[col].astype("category")
+
+    # --- Crear columna 'Frente' ---
+    # Solo quedan como categorías los frentes presentes en el archivo
+    es_tractomula = (df["Descripción del grupo de equipos"] == "FRENTE TRACTOR MULA - CAMPO").to_numpy(dtype=bool)
+    df["Frente"] = pd.Categorical.from_codes(
+        np.where(es_tractomula, 0, 1).astype("int8"), categories=["TRACTOMULA", "TRACTORES"]
+    ).remove_unused_categories()
+
+    # --- Calcular duración en horas ---
+    inicio = parsear_fecha(df["Hora de inicio"], formato_fecha)
+    fin = parsear_fecha(df["Hora de finalización"], formato_fecha)
+    df["Hora de inicio"] = inicio
+    df["Hora de finalización"] = fin
+    df["Duracion_h"] = ((fin - inicio).dt.total_seconds() / 3600).astype("float32")
+
+    # --- Normalizar GOP ---
+    # AUXILIAR se cuenta como PRODUCTIVO; la comparación se hace sobre las categorías, no por fila
+    gop = df["Descripción del grupo de operaciones"]
+    categorias = gop.cat.categories
+    renombradas = categorias.where(categorias.astype(str).str.upper() != "AUXILIAR", "PRODUCTIVO")
+    nuevas = renombradas.unique()
+    try:
+        nuevas = nuevas.sort_values()
+    except TypeError:
+        pass
+    recodigo = nuevas.get_indexer(renombradas)
+    codigos = gop.cat.codes.to_numpy()
+    df["GOP"] = pd.Categorical.from_codes(
+        np.where(codigos >= 0, recodigo[codigos], -1), categories=nuevas
+    )
+
+    df.attrs["memoria_mb"] = {"antes": memoria_antes, "despues": uso_memoria_mb(df)}
+    return df
+
+
+def parsear_fecha(serie, formato=FORMATO_FECHA):
+    """Convierte a datetime64[ns] usando un formato explícito.
+
+    Las celdas de fecha de Excel ya llegan como datetime64 y no se vuelven a parsear. Si el
+    formato explícito no reconoce algún valor se recurre a la inferencia de pandas. La unidad
+    es siempre nanosegundos (Parquet y Arrow suelen traer microsegundos), así que el entero
+    de una misma hora es igual sin importar el formato del archivo.
+    """
+    if pd.api.types.is_datetime64_any_dtype(serie):
+        return serie.dt.as_unit("ns")
+    if isinstance(serie.dtype, pd.CategoricalDtype):
+        serie = serie.astype(object)
+    fechas = pd.to_datetime(serie, format=formato, errors="coerce")
+    if fechas.isna().sum() > serie.isna().sum():
+        fechas = pd.to_datetime(serie, errors="coerce")
+    return fechas.dt.as_unit("ns")
+
+
+def uso_memoria_mb(df):
+    return float(df.memory_usage(deep=True).sum()) / 1024 ** 2
+
+
+def formato_de(nombre):
+    extension = os.path.splitext(nombre)[1].lower()
+    if extension not in FORMATOS:
+        raise ValueError(f"Formato no soportado: '{extension}'. Use uno de: {', '.join(EXTENSIONES)}")
+    return FORMATOS[extension]
+
+
+def _verificar_columnas(presentes):
+    faltantes = [c for c in COLUMNAS_ENTRADA if c not in presentes]
+    if faltantes:
+        raise ValueError(f"Faltan columnas en el archivo: {', '.join(faltantes)}")
+
+
+def _leer_excel(contenido, progreso=None):
+    if len(contenido) > UMBRAL_STREAMING_MB * 1024 ** 2:
+        return leer_excel_streaming(contenido, progreso=progreso)
+    return pd.read_excel(BytesIO(contenido), usecols=lambda c: c in COLUMNAS_ENTRADA)
+
+
+def _bloque_tipado(columnas):
+    """Convierte un bloque de columnas (tuplas de valores de Python) a arrays tipados.
+
+    El texto se pasa a ``str`` (las celdas vacías quedan como nulos) y las categorías son
+    siempre ``object``: un bloque con códigos numéricos, o con la columna vacía, se une sin
+    errores con otro de códigos alfanuméricos.
+    """
+    bloque = {}
+    for nombre, valores in zip(COLUMNAS_ENTRADA, columnas):
+        if nombre in COLUMNAS_FECHA:
+            bloque[nombre] = parsear_fecha(pd.Series(valores, dtype=object)).to_numpy()
+        else:
+            textos = [None if v is None else str(v) for v in valores]
+            categorias = pd.Index(sorted({v for v in textos if v is not None}), dtype=object)
+            bloque[nombre] = pd.Categorical(textos, categories=categorias)
+    return bloque
+
+
+def leer_excel_streaming(contenido, progreso=None, filas_por_bloque=FILAS_POR_BLOQUE):
+    """Lee la primera hoja con openpyxl en modo solo lectura, por bloques de filas.
+
+    De cada fila se toman solo las columnas del pipeline y cada bloque se convierte enseguida
+    a categóricos y datetime64, así que el pico de memoria depende del DataFrame resultante y
+    no del libro completo. ``progreso(filas_leidas, filas_totales)`` se llama tras cada bloque;
+    ``filas_totales`` es None si el archivo no declara sus dimensiones.
+    """
+    from openpyxl import load_workbook
+
+    libro = load_workbook(BytesIO(contenido), read_only=True, data_only=True)
+    try:
+        hoja = libro.worksheets[0]
+        filas = hoja.iter_rows(values_only=True)
+        encabezado = next(filas, ())
+        _verificar_columnas(encabezado)
+        posiciones = [encabezado.index(c) for c in COLUMNAS_ENTRADA]
+        seleccionar = itemgetter(*posiciones)
+        ancho = max(posiciones) + 1
+        total = hoja.max_row - 1 if hoja.max_row else None
+
+        bloques, leidas = [], 0
+        while True:
+            filas_bloque = list(islice(filas, filas_por_bloque))
+            if not filas_bloque:
+                break
+            try:
+                seleccion = list(map(seleccionar, filas_bloque))
+            except IndexError:
+                # Filas más cortas que el encabezado (celdas vacías al final)
+                seleccion = [seleccionar(f + (None,) * (ancho - len(f))) for f in filas_bloque]
+            # Las filas sin ningún valor (p. ej. filas vacías con formato al final de la hoja)
+            # no son registros; read_excel tampoco las devuelve
+            seleccion = [f for f in seleccion if any(v is not None for v in f)]
+            if seleccion:
+                bloques.append(_bloque_tipado(zip(*seleccion)))
+            leidas += len(filas_bloque)
+            if progreso:
+                progreso(leidas, total)
+    finally:
+        libro.close()
+
+    if not bloques:
+        return pd.DataFrame(columns=COLUMNAS_ENTRADA)
+    return pd.DataFrame({
+        nombre: (
+            np.concatenate([b[nombre] for b in bloques]) if nombre in COLUMNAS_FECHA
+            else union_categoricals([b[nombre] for b in bloques])
+        )
+        for nombre in COLUMNAS_ENTRADA
+    })
+
+
+def _leer_csv(contenido):
+    # El texto se lee directamente como categórico; las fechas se parsean al normalizar
+    opciones = dict(
+        usecols=lambda c: c in COLUMNAS_ENTRADA,
+        dtype={c: "category" for c in COLUMNAS_CATEGORICAS},
+    )
+    try:
+        return pd.read_csv(BytesIO(contenido), encoding="utf-8-sig", **opciones)
+    except UnicodeDecodeError:
+        # Exportaciones de Excel en Windows
+        return pd.read_csv(BytesIO(contenido), encoding="latin-1", **opciones)
+
+
+def _tabla_a_pandas(tabla):
+    """Convierte una tabla Arrow a pandas con el texto como categórico (diccionario en Arrow)."""
+    import pyarrow as pa
+
+    for i, nombre in enumerate(tabla.column_names):
+        columna = tabla.column(i)
+        if nombre in COLUMNAS_CATEGORICAS and not pa.types.is_dictionary(columna.type):
+            tabla = tabla.set_column(i, nombre, columna.dictionary_encode())
+    return tabla.to_pandas()
+
+
+def _leer_parquet(contenido):
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError as e:
+        raise ValueError("Se requiere pyarrow para leer archivos Parquet") from e
+
+    esquema = pq.read_schema(pa.BufferReader(contenido))
+    _verificar_columnas(esquema.names)
+    # Las columnas de texto se leen ya codificadas como diccionario (sin materializar cada cadena)
+    texto = [c for c in COLUMNAS_CATEGORICAS if pa.types.is_string(esquema.field(c).type)]
+    tabla = pq.read_table(pa.BufferReader(contenido), columns=COLUMNAS_ENTRADA, read_dictionary=texto)
+    return _tabla_a_pandas(tabla)
+
+
+def _leer_arrow(contenido):
+    try:
+        import pyarrow as pa
+        import pyarrow.feather as feather
+    except ImportError as e:
+        raise ValueError("Se requiere pyarrow para leer archivos Arrow/Feather") from e
+
+    # BufferReader no copia los datos: las columnas apuntan al buffer subido
+    tabla = feather.read_table(pa.BufferReader(contenido), memory_map=False)
+    _verificar_columnas(tabla.column_names)
+    return _tabla_a_pandas(tabla.select(COLUMNAS_ENTRADA))
+
+
+LECTORES = {
+    "excel": _leer_excel,
+    "csv": _leer_csv,
+    "parquet": _leer_parquet,
+    "arrow": _leer_arrow,
+}
+
+
+def leer(contenido, nombre, progreso=None):
+    """Lee solo las columnas del pipeline, con el lector que corresponde a la extensión de ``nombre``.
+
+    ``progreso`` solo lo usa la lectura en streaming de Excel.
+    """
+    formato = formato_de(nombre)
+    if formato == "excel":
+        df = _leer_excel(contenido, progreso=progreso)
+    else:
+        df = LECTORES[formato](contenido)
+    _verificar_columnas(df.columns)
+    return df
+
+
+def _ruta_sidecar(clave, dir_cache):
+    return os.path.join(dir_cache, f"{clave}.parquet")
+
+
+def _leer_sidecar(clave, dir_cache):
+    ruta = _ruta_sidecar(clave, dir_cache)
+    if not os.path.exists(ruta):
+        return None
+    try:
+        return pd.read_parquet(ruta)
+    except (ImportError, OSError, ValueError):
+        # Sin motor Parquet o archivo dañado: se vuelve a procesar el Excel
+        return None
+
+
+def _guardar_sidecar(df, clave, dir_cache):
+    ruta = _ruta_sidecar(clave, dir_cache)
+    temporal = f"{ruta}.{os.getpid()}.tmp"
+    try:
+        os.makedirs(dir_cache, exist_ok=True)
+        df.to_parquet(temporal, index=False)
+        os.replace(temporal, ruta)
+    except (ImportError, OSError, TypeError, ValueError):
+        # La copia en disco es opcional; si falla se sigue trabajando solo en memoria
+        if os.path.exists(temporal):
+            os.remove(temporal)
+
+
+def cargar(contenido, nombre="archivo.xlsx", clave=None, dir_cache=DIR_CACHE, perfil=SIN_PERFIL, progreso=None):
+    """Lee el archivo subido (Excel, CSV, Parquet o Arrow) y devuelve el DataFrame normalizado.
+
+    Si hay ``dir_cache`` se consulta primero la copia Parquet del mismo contenido,
+    y si no existe se crea después de procesar el archivo.
+    """
+    clave = clave or huella(contenido)
+
+    if dir_cache:
+        with perfil.etapa("leer_cache_disco"):
+            df = _leer_sidecar(clave, dir_cache)
+        if df is not None:
+            return df
+
+    with perfil.etapa(f"leer_{formato_de(nombre)}"):
+        df = leer(contenido, nombre, progreso=progreso)
+    with perfil.etapa("normalizar"):
+        df = normalizar(df)
+
+    if dir_cache:
+        with perfil.etapa("guardar_cache_disco"):
+            _guardar_sidecar(df, clave, dir_cache)
+    return df
+
+
+def cargar_ruta(ruta, dir_cache=DIR_CACHE):
+    """Igual que ``cargar`` pero a partir de un archivo en disco."""
+    with open(ruta, "rb") as f:
+        return cargar(f.read(), nombre=ruta, dir_cache=dir_cache)
@@ -0,0 +1,126 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+import calculos
+
+# ==========================================
+# CUBETAS DE TIEMPO
+# ==========================================
+# Horas de inicio de cada turno (el último turno termina donde empieza el primero del día siguiente)
+TURNOS = [int(h) for h in os.environ.get("INDICADORES_TURNOS", "6,14,22").split(",")]
+
+HORA_NS = 3600 * 10 ** 9
+DIA_NS = 24 * HORA_NS
+# 1970-01-05 fue lunes: las semanas empiezan el lunes a las 00:00
+LUNES_NS = 4 * DIA_NS
+
+PERIODOS = ["hora", "turno", "dia", "semana"]
+
+
+def _rejilla(periodo, turnos=TURNOS):
+    """(origen, duración del ciclo, desplazamientos de cada cubeta dentro del ciclo) en ns.
+
+    Todas las cubetas se describen como un ciclo que se repite: horas y días son ciclos de una
+    sola cubeta; los turnos son un ciclo diario con una cubeta por turno.
+    """
+    if periodo == "hora":
+        return 0, HORA_NS, np.array([0])
+    if periodo == "dia":
+        return 0, DIA_NS, np.array([0])
+    if periodo == "semana":
+        return LUNES_NS, 7 * DIA_NS, np.array([0])
+    if periodo == "turno":
+        inicios = np.sort(np.asarray(turnos, dtype="int64") * HORA_NS)
+        return int(inicios[0]), DIA_NS, inicios - inicios[0]
+    raise ValueError(f"Periodo no soportado: '{periodo}'. Use uno de: {', '.join(PERIODOS)}")
+
+
+def _indice(t, origen, ciclo, desplazamientos):
+    """Número de cubeta (entero global) que contiene cada instante ``t`` (ns)."""
+    relativo = t - origen
+    ciclos = np.floor_divide(relativo, ciclo)
+    dentro = relativo - ciclos * ciclo
+    return ciclos * len(desplazamientos) + np.searchsorted(desplazamientos, dentro, side="right") - 1
+
+
+def _inicio_cubeta(indice, origen, ciclo, desplazamientos):
+    k = len(desplazamientos)
+    return origen + np.floor_divide(indice, k) * ciclo + desplazamientos[np.mod(indice, k)]
+
+
+def a_ns(serie):
+    valores = pd.to_datetime(serie).to_numpy()
+    return valores.astype("datetime64[ns]").astype("int64"), np.isnat(valores)
+
+
+def ordenar_por_equipo(codigos, inicio):
+    """Posiciones que dejan los registros ordenados por (equipo, inicio).
+
+    Los archivos suelen venir agrupados por equipo y ordenados por hora; en ese caso no hace
+    falta ordenar (basta con que cada equipo ocupe un solo tramo contiguo, en cualquier orden).
+    ``codigos`` son los códigos categóricos del equipo (-1 = nulo) e ``inicio`` los ns de inicio.
+    """
+    codigos = np.asarray(codigos, dtype="int64")
+    cambio = np.diff(codigos) != 0
+    agrupados = (
+        np.all(cambio | (np.diff(inicio) >= 0))
+        and np.count_nonzero(cambio) + 1 == np.count_nonzero(np.bincount(codigos + 1))
+    )
+    if len(codigos) == 0 or agrupados:
+        return np.arange(len(codigos))
+    return np.lexsort((inicio, codigos))
+
+
+def dividir(inicio, fin, periodo="dia", turnos=TURNOS):
+    """Divide cada intervalo [inicio, fin) en las cubetas de ``periodo`` que atraviesa.
+
+    Devuelve (fila, cubeta, horas): la posición del intervalo original, el inicio de la cubeta
+    (datetime64) y las horas del intervalo que caen en ella. Todo se calcula con arrays de
+    NumPy: un intervalo que cruza medianoche o un cambio de turno se reparte entre ambos.
+    Los intervalos sin fechas o con fin <= inicio se ignoran.
+    """
+    origen, ciclo, desplazamientos = _rejilla(periodo, turnos)
+    ini, ini_nulo = a_ns(inicio)
+    fin, fin_nulo = a_ns(fin)
+
+    validas = np.flatnonzero(~ini_nulo & ~fin_nulo & (fin > ini))
+    ini, fin = ini[validas], fin[validas]
+
+    primera = _indice(ini, origen, ciclo, desplazamientos)
+    ultima = _indice(fin - 1, origen, ciclo, desplazamientos)  # fin es exclusivo
+    partes = ultima - primera + 1
+
+    # Una fila por (intervalo, cubeta): posición del intervalo y número de la cubeta
+    fila = np.repeat(np.arange(len(validas)), partes)
+    desfase = np.arange(len(fila)) - np.repeat(np.cumsum(partes) - partes, partes)
+    cubeta = primera[fila] + desfase
+
+    desde = _inicio_cubeta(cubeta, origen, ciclo, desplazamientos)
+    hasta = _inicio_cubeta(cubeta + 1, origen, ciclo, desplazamientos)
+    horas = (np.minimum(fin[fila], hasta) - np.maximum(ini[fila], desde)) / HORA_NS
+
+    return validas[fila], desde.astype("datetime64[ns]"), horas
+
+
+def horas_por_cubeta(df, periodo="dia", turnos=TURNOS, por=(calculos.FRENTE, calculos.EQUIPO, calculos.GOP), sin_fin=False):
+    """Horas por ``por`` + 'Cubeta' a partir del DataFrame normalizado."""
+    if sin_fin:
+        df = df[df[calculos.OPERACION] != calculos.FIN_OPERACION]
+    fila, cubeta, horas = dividir(df["Hora de inicio"], df["Hora de finalización"], periodo, turnos)
+
+    # .array conserva el tipo categórico de las claves (la agrupación usa sus códigos)
+    partes = pd.DataFrame({
+        **{col: df[col].take(fila).array for col in por},
+        "Cubeta": cubeta,
+        "Horas": horas,
+    })
+    return partes.groupby([*por, "Cubeta"], observed=True)["Horas"].sum().reset_index()
+
+
+def tendencia_gop(df, periodo="dia", turnos=TURNOS, sin_fin=False):
+    """% de horas de cada GOP por frente y cubeta, para los gráficos de tendencia."""
+    horas = horas_por_cubeta(df, periodo, turnos, por=(calculos.FRENTE, calculos.GOP), sin_fin=sin_fin)
+    horas["%"] = 100 * horas["Horas"] / horas.groupby([calculos.FRENTE, "Cubeta"], observed=True)["Horas"].transform("sum")
+    return horas
@@ -0,0 +1,84 @@
+"""Procesamiento por lotes de los indicadores, sin Streamlit.
+
+Uso:
+    python lote.py DIRECTORIO --salida resultados --formato parquet --procesos 4 --motor duckdb
+
+Cada archivo del directorio se procesa en un proceso aparte. Por cada vista y tabla se
+escribe un archivo consolidado (p. ej. ``sin_fin_resumen.parquet``) con una columna
+'Archivo' que indica de qué archivo sale cada fila.
+"""
+import argparse
+import glob
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from functools import partial
+
+import pandas as pd
+
+import calculos
+import ingesta
+import motores
+
+
+def procesar_archivo(ruta, motor=motores.MOTOR):
+    """Carga un archivo y devuelve sus tablas de KPI: {vista: {tabla: DataFrame}}."""
+    return calculos.calcular_kpis(ingesta.cargar_ruta(ruta), construir=partial(motores.construir_cubo, motor=motor))
+
+
+def escribir_tabla(df, ruta, formato):
+    if formato == "parquet":
+        df.to_parquet(ruta, index=False)
+    else:
+        df.to_csv(ruta, index=False, encoding="utf-8-sig")
+
+
+def consolidar(resultados):
+    """Une las tablas de todos los archivos: {(vista, tabla): DataFrame}."""
+    partes = {}
+    for archivo, kpis in sorted(resultados.items()):
+        for vista, tablas in kpis.items():
+            for nombre, tabla in tablas.items():
+                partes.setdefault((vista, nombre), []).append(tabla.assign(Archivo=archivo))
+    return {clave: pd.concat(tablas, ignore_index=True) for clave, tablas in partes.items()}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Calcula los indicadores de productividad de un directorio de archivos.")
+    parser.add_argument("directorio", help="Directorio con los archivos a procesar")
+    parser.add_argument("--patron", default="*.xlsx",
+                        help="Patrón de los archivos (por defecto: *.xlsx; también admite .csv, .parquet, .arrow)")
+    parser.add_argument("--salida", default="resultados", help="Directorio de salida (por defecto: resultados)")
+    parser.add_argument("--formato", choices=["parquet", "csv"], default="parquet")
+    parser.add_argument("--procesos", type=int, default=os.cpu_count(), help="Procesos en paralelo (por defecto: núcleos disponibles)")
+    parser.add_argument("--motor", choices=list(motores.MOTORES), default=motores.MOTOR,
+                        help="Motor de agregación (por defecto: INDICADORES_MOTOR o pandas)")
+    args = parser.parse_args(argv)
+
+    rutas = sorted(glob.glob(os.path.join(args.directorio, args.patron)))
+    if not rutas:
+        print(f"No se encontraron archivos '{args.patron}' en {args.directorio}", file=sys.stderr)
+        return 1
+
+    resultados, errores = {}, {}
+    with ProcessPoolExecutor(max_workers=args.procesos) as pool:
+        futuros = {pool.submit(procesar_archivo, ruta, args.motor): os.path.basename(ruta) for ruta in rutas}
+        for futuro in as_completed(futuros):
+            archivo = futuros[futuro]
+            try:
+                resultados[archivo] = futuro.result()
+                print(f"✔ {archivo}")
+            except Exception as e:
+                errores[archivo] = e
+                print(f"✘ {archivo}: {e}", file=sys.stderr)
+
+    os.makedirs(args.salida, exist_ok=True)
+    for (vista, nombre), tabla in consolidar(resultados).items():
+        escribir_tabla(tabla, os.path.join(args.salida, f"{vista}_{nombre}.{args.formato}"), args.formato)
+
+    print(f"{len(resultados)} archivos procesados, {len(errores)} con error. Resultados en {args.salida}")
+    return 1 if errores else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,148 @@
+"""Motores intercambiables para la agregación de registros (pandas, Polars o DuckDB).
+
+Uso:
+    python motores.py --filas 1000000          # compara todos los motores instalados
+
+La única pasada sobre las filas crudas es ``construir_cubo``; las tablas de cada vista se
+derivan del cubo (miles de filas) con pandas. Por eso el motor solo reemplaza esa pasada:
+Polars y DuckDB la ejecutan en paralelo sobre columnas y devuelven un cubo con el mismo
+formato, del que salen exactamente las mismas tablas. Polars y DuckDB son opcionales.
+"""
+import argparse
+import os
+import sys
+import time
+
+import pandas as pd
+
+import calculos
+import generador
+import ingesta
+
+# Motor por defecto de la aplicación y del procesamiento por lotes
+MOTOR = os.environ.get("INDICADORES_MOTOR", "pandas")
+
+COLUMNAS_CUBO = calculos.NIVELES_CUBO + ["Duracion_h"]
+
+
+def _cubo_pandas(df):
+    return calculos.construir_cubo(df)
+
+
+def _cubo_polars(df):
+    import polars as pl
+
+    tabla = (
+        pl.from_pandas(df[COLUMNAS_CUBO])
+        .lazy()
+        .group_by(calculos.NIVELES_CUBO)
+        .agg(
+            pl.col("Duracion_h").sum().alias("Horas"),
+            pl.len().cast(pl.Int64).alias("Registros"),
+        )
+        # Las categorías de Polars siguen el orden de aparición; como texto, cubo_desde_tabla
+        # las ordena igual que pandas
+        .with_columns(pl.col(calculos.NIVELES_CUBO).cast(pl.String))
+        .collect()
+        .to_pandas()
+    )
+    return calculos.cubo_desde_tabla(tabla)
+
+
+def _cubo_duckdb(df):
+    import duckdb
+
+    niveles = ", ".join(f'"{col}"' for col in calculos.NIVELES_CUBO)
+    registros = df[COLUMNAS_CUBO]
+    with duckdb.connect() as con:
+        con.register("registros", registros)
+        tabla = con.execute(f"""
+            SELECT {niveles}, SUM("Duracion_h") AS "Horas", COUNT(*) AS "Registros"
+            FROM registros
+            GROUP BY {niveles}
+        """).df()
+    return calculos.cubo_desde_tabla(tabla)
+
+
+MOTORES = {
+    "pandas": _cubo_pandas,
+    "polars": _cubo_polars,
+    "duckdb": _cubo_duckdb,
+}
+
+
+def disponibles():
+    """Motores cuya librería está instalada."""
+    instalados = ["pandas"]
+    for motor in ["polars", "duckdb"]:
+        try:
+            __import__(motor)
+        except ImportError:
+            continue
+        instalados.append(motor)
+    return instalados
+
+
+def construir_cubo(df, motor=MOTOR):
+    """Cubo de ``calculos.construir_cubo`` calculado con ``motor``."""
+    if motor not in MOTORES:
+        raise ValueError(f"Motor no soportado: '{motor}'. Use uno de: {', '.join(MOTORES)}")
+    return MOTORES[motor](df)
+
+
+def diferencias(esperado, obtenido):
+    """Tablas de ``obtenido`` que no coinciden con ``esperado`` ({vista: {tabla: DataFrame}}).
+
+    Las filas se comparan sin importar su orden (salvo en el top 5, donde el orden es parte
+    del resultado) y las horas con tolerancia relativa de 1e-5, porque sumar float32 en otro
+    orden cambia los últimos decimales.
+    """
+    errores = []
+    for vista, tablas in esperado.items():
+        for nombre, tabla in tablas.items():
+            otra = obtenido[vista][nombre]
+            if nombre != "top5":
+                columnas = [c for c in tabla.columns if not pd.api.types.is_float_dtype(tabla[c])]
+                tabla = tabla.sort_values(columnas, ignore_index=True)
+                otra = otra.sort_values(columnas, ignore_index=True)
+            try:
+                pd.testing.assert_frame_equal(
+                    tabla, otra, check_dtype=False, check_categorical=False, check_exact=False, rtol=1e-5
+                )
+            except AssertionError as e:
+                errores.append(f"{vista}/{nombre}: {' '.join(str(e).split())[:300]}")
+    return errores
+
+
+def paridad(df, motores=None):
+    """Compara las tablas de cada motor con las de pandas: {motor: (segundos del cubo, diferencias)}."""
+    esperado = calculos.calcular_kpis(df)
+    resultados = {}
+    for motor in motores or disponibles():
+        t0 = time.perf_counter()
+        cubo = construir_cubo(df, motor)
+        segundos = time.perf_counter() - t0
+        obtenido = {vista: calculos.calcular_vista(cubo, sin_fin) for vista, sin_fin in calculos.VISTAS.items()}
+        resultados[motor] = (segundos, diferencias(esperado, obtenido))
+    return resultados
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compara los motores de agregación con pandas.")
+    parser.add_argument("--filas", type=int, default=100_000)
+    parser.add_argument("--semilla", type=int, default=0)
+    parser.add_argument("--motores", nargs="+", choices=list(MOTORES), help="Por defecto, todos los instalados")
+    args = parser.parse_args(argv)
+
+    df = ingesta.normalizar(generador.generar(args.filas, semilla=args.semilla))
+    codigo = 0
+    for motor, (segundos, errores) in paridad(df, args.motores).items():
+        print(f"{'✔' if not errores else '✘'} {motor:<8} cubo en {segundos:.3f} s")
+        for error in errores:
+            print(f"    {error}")
+        codigo = codigo or int(bool(errores))
+    return codigo
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,86 @@
+import json
+import os
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime
+
+# Activa el perfilado para todas las sesiones (también se puede activar con ?perfil=1 en la URL)
+PERFIL_ENV = os.environ.get("INDICADORES_PERFIL", "").lower() in ("1", "true", "si", "sí")
+
+# tracemalloc es global al proceso: se enciende con la primera etapa medida (de cualquier
+# sesión) y se apaga al terminar la última, nunca en medio de la etapa de otra sesión
+_candado_traza = threading.Lock()
+_etapas_activas = 0
+_traza_propia = False
+
+
+def _empezar_traza():
+    global _etapas_activas, _traza_propia
+    with _candado_traza:
+        _etapas_activas += 1
+        if _etapas_activas == 1:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                _traza_propia = True
+            # El pico solo se reinicia si no hay otra etapa midiendo
+            tracemalloc.reset_peak()
+
+
+def _terminar_traza():
+    """Pico de memoria trazada (bytes) desde que empezó la etapa activa más antigua."""
+    global _etapas_activas, _traza_propia
+    with _candado_traza:
+        _, pico = tracemalloc.get_traced_memory()
+        _etapas_activas -= 1
+        if _etapas_activas == 0 and _traza_propia:
+            tracemalloc.stop()
+            _traza_propia = False
+    return pico
+
+
+class Perfil:
+    """Registra tiempo de pared, tiempo de CPU y pico de memoria de cada etapa del pipeline.
+
+    Si no está activo, ``etapa`` no mide nada y no agrega costo. El tiempo de CPU es el del
+    hilo actual (cada sesión de Streamlit corre en su propio hilo); el pico de memoria viene
+    de tracemalloc, que cuenta las asignaciones de todo el proceso durante la etapa (si otras
+    sesiones están midiendo a la vez, desde que empezó la etapa más antigua en curso).
+    """
+
+    def __init__(self, activo=True):
+        self.activo = activo
+        self.etapas = []
+        self.inicio = datetime.now().isoformat(timespec="seconds")
+
+    @contextmanager
+    def etapa(self, nombre):
+        if not self.activo:
+            yield
+            return
+
+        _empezar_traza()
+        pared0, cpu0 = time.perf_counter(), time.thread_time()
+        try:
+            yield
+        finally:
+            pared, cpu = time.perf_counter() - pared0, time.thread_time() - cpu0
+            pico = _terminar_traza()
+            self.etapas.append({
+                "etapa": nombre,
+                "pared_s": round(pared, 4),
+                "cpu_s": round(cpu, 4),
+                "pico_mb": round(pico / 1024 ** 2, 2),
+            })
+
+    def total(self):
+        return sum(e["pared_s"] for e in self.etapas)
+
+    def a_json(self):
+        return json.dumps({"inicio": self.inicio, "total_s": round(self.total(), 4), "etapas": self.etapas},
+                          ensure_ascii=False, indent=2)
+
+
+# Perfil nulo para los llamados sin perfilado
+SIN_PERFIL = Perfil(activo=False)
@@ -0,0 +1,131 @@
+"""Reporte ejecutivo en Excel con las tablas y gráficos de ambas vistas.
+
+El libro se escribe con openpyxl en modo ``write_only``: cada fila se vuelca al archivo al
+agregarla, así que las hojas de detalle largas no quedan completas en memoria. Los reportes
+se generan en un hilo aparte (``en_segundo_plano``) a partir de tablas ya calculadas y de los
+PNG de la caché de gráficos, de modo que el dashboard sigue respondiendo mientras tanto.
+openpyxl se importa al generar el primer reporte, no al abrir la app.
+"""
+import math
+import os
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from io import BytesIO
+
+import numpy as np
+import pandas as pd
+
+# Reportes que se pueden generar a la vez (el ejecutor es compartido por todas las sesiones)
+HILOS_REPORTE = int(os.environ.get("INDICADORES_HILOS_REPORTE", "2"))
+
+# Nombre de hoja para cada tabla de una vista
+HOJAS = {
+    "resumen": "Riesgo",
+    "top5": "Top 5 pérdida",
+    "tabla_rangos": "Rangos",
+    "equipos": "Equipos",
+    "horas_gop": "Horas por GOP",
+}
+
+# Ancho de los gráficos en el libro (px) y alto aproximado de una fila de Excel (px)
+ANCHO_IMAGEN = 900
+ALTO_FILA = 20
+
+_ejecutor = ThreadPoolExecutor(max_workers=HILOS_REPORTE, thread_name_prefix="reporte")
+
+
+def _valor(valor):
+    """Valor de pandas/NumPy como tipo nativo que openpyxl sabe escribir."""
+    if valor is None or (not isinstance(valor, str) and pd.isna(valor)):
+        return None
+    if isinstance(valor, pd.Timestamp):
+        return valor.to_pydatetime()
+    if isinstance(valor, np.generic):
+        return valor.item()
+    return valor
+
+
+def _titulo(hoja, texto, tamano=14):
+    from openpyxl.cell import WriteOnlyCell
+    from openpyxl.styles import Font
+
+    celda = WriteOnlyCell(hoja, value=texto)
+    celda.font = Font(bold=True, size=tamano, color="2C3E50")
+    hoja.append([celda])
+
+
+def _escribir_tabla(hoja, tabla):
+    from openpyxl.cell import WriteOnlyCell
+    from openpyxl.styles import Font, PatternFill
+
+    encabezado = []
+    for columna in tabla.columns:
+        celda = WriteOnlyCell(hoja, value=str(columna))
+        celda.font = Font(bold=True, color="2C3E50")
+        celda.fill = PatternFill("solid", fgColor="F1F3F6")
+        encabezado.append(celda)
+    hoja.append(encabezado)
+    for fila in tabla.itertuples(index=False, name=None):
+        hoja.append([_valor(v) for v in fila])
+
+
+def _agregar_imagenes(hoja, imagenes, fila):
+    """Inserta los PNG uno debajo del otro, cada uno con su título; ``fila`` es la próxima fila libre."""
+    from openpyxl.drawing.image import Image
+
+    for titulo, png in imagenes:
+        _titulo(hoja, titulo, tamano=12)
+        imagen = Image(BytesIO(png))
+        escala = ANCHO_IMAGEN / imagen.width
+        imagen.width, imagen.height = ANCHO_IMAGEN, int(imagen.height * escala)
+        imagen.anchor = f"A{fila + 1}"
+        hoja.add_image(imagen)
+        # En modo write_only las imágenes flotan sobre la hoja: se dejan filas vacías de su alto
+        filas_imagen = math.ceil(imagen.height / ALTO_FILA) + 1
+        for _ in range(filas_imagen):
+            hoja.append([])
+        fila += 1 + filas_imagen
+
+
+def _nombre_hoja(prefijo, nombre):
+    # Excel limita los nombres de hoja a 31 caracteres
+    return f"{prefijo} - {nombre}"[:31]
+
+
+def generar_excel(titulo, parametros, vistas):
+    """Bytes del libro .xlsx.
+
+    ``parametros`` es un dict {descripción: valor} que se escribe en la hoja de portada.
+    ``vistas`` es {prefijo: {"titulo": str, "tablas": {tabla: DataFrame}, "imagenes": [(título, png)]}}.
+    """
+    from openpyxl import Workbook
+
+    libro = Workbook(write_only=True)
+
+    portada = libro.create_sheet("Portada")
+    _titulo(portada, titulo, tamano=16)
+    portada.append([f"Generado el {datetime.now():%d/%m/%Y %H:%M}"])
+    portada.append([])
+    for descripcion, valor in parametros.items():
+        portada.append([descripcion, _valor(valor)])
+
+    for prefijo, vista in vistas.items():
+        graficos = libro.create_sheet(_nombre_hoja(prefijo, "Gráficos"))
+        _titulo(graficos, vista["titulo"])
+        _agregar_imagenes(graficos, vista["imagenes"], fila=2)
+
+        for nombre, hoja in HOJAS.items():
+            tabla = vista["tablas"].get(nombre)
+            if tabla is None:
+                continue
+            destino = libro.create_sheet(_nombre_hoja(prefijo, hoja))
+            _escribir_tabla(destino, tabla)
+
+    buffer = BytesIO()
+    libro.save(buffer)
+    return buffer.getvalue()
+
+
+def en_segundo_plano(titulo, parametros, vistas):
+    """Encola la generación del libro; devuelve un Future con sus bytes."""
+    return _ejecutor.submit(generar_excel, titulo, parametros, vistas)
@@ -0,0 +1,184 @@
+"""Modo en vivo: sigue un directorio o un CSV al que se le agregan filas y mantiene el cubo al día.
+
+En cada actualización solo se leen los datos nuevos:
+  - CSV: los bytes agregados desde la lectura anterior (solo líneas completas), con el
+    encabezado del archivo delante.
+  - Otros formatos (Excel, Parquet, Arrow) en un directorio: los archivos nuevos o
+    modificados, completos.
+Las filas nuevas se agregan a un cubo propio que se suma al acumulado con
+``calculos.sumar_cubos``; nunca se vuelve a agregar la historia completa.
+"""
+import glob
+import os
+import threading
+from datetime import datetime
+
+import calculos
+import ingesta
+
+# Directorio o archivo CSV a seguir; si no se define, el dashboard no ofrece el modo en vivo
+RUTA_VIVO = os.environ.get("INDICADORES_VIVO")
+
+# Cada cuántos segundos se buscan datos nuevos y se refrescan los gráficos
+INTERVALO_S = float(os.environ.get("INDICADORES_VIVO_SEGUNDOS", "30"))
+
+# Bytes del comienzo de un CSV que se comparan para detectar que el archivo fue reemplazado
+BYTES_CABEZA = 64 * 1024
+
+
+class Seguimiento:
+    """Estado del seguimiento de ``ruta``; ``actualizar`` es seguro entre hilos (y sesiones)."""
+
+    def __init__(self, ruta=RUTA_VIVO):
+        self.ruta = ruta
+        self._candado = threading.Lock()
+        self._leidos = {}       # archivo -> estado de lectura (CSV, ver _nuevas_csv) o (tamaño, mtime) (otros formatos)
+        self._encabezados = {}  # archivo CSV -> línea de encabezado
+        self._cubos = {}        # archivo -> cubo de sus filas
+        self.errores = {}       # archivo -> último error de lectura (se reintenta en la próxima)
+        self.cubo = None
+        self.version = 0
+        self.actualizado = None
+
+    def _archivos(self):
+        if os.path.isdir(self.ruta):
+            return sorted(
+                ruta for ruta in glob.glob(os.path.join(self.ruta, "*"))
+                if os.path.splitext(ruta)[1].lower() in ingesta.FORMATOS
+            )
+        return [self.ruta] if os.path.exists(self.ruta) else []
+
+    @staticmethod
+    def _cabeza(f):
+        """Encabezado y primera fila del archivo (lo que haya completo de ellos)."""
+        f.seek(0)
+        inicio = f.read(BYTES_CABEZA)
+        fin = inicio.find(b"\n", inicio.find(b"\n") + 1) + 1
+        return inicio[:fin] if fin else inicio[:inicio.rfind(b"\n") + 1]
+
+    @staticmethod
+    def _reemplazado(f, estado, previo):
+        """True si el archivo ya no es una extensión de lo leído antes (``previo``)."""
+        if estado.st_ino != previo["inodo"] or estado.st_size < previo["posicion"]:
+            return True
+        # Agregar filas siempre cambia el tamaño: mismo tamaño con otro mtime es una reescritura
+        if estado.st_size == previo["tamano"] and estado.st_mtime_ns != previo["mtime"]:
+            return True
+        f.seek(0)
+        if f.read(len(previo["cabeza"])) != previo["cabeza"]:
+            return True
+        ultima = previo["ultima"]
+        f.seek(previo["posicion"] - len(ultima))
+        return f.read(len(ultima)) != ultima
+
+    def _nuevas_csv(self, ruta):
+        """(contenido CSV con las líneas completas agregadas, estado leído, reemplaza_archivo).
+
+        El estado guarda la posición leída junto con el inodo, tamaño y mtime del archivo, su
+        encabezado y primera fila, y la última línea leída. Si el archivo se reemplazó (otro
+        inodo, otro comienzo, más corto, reescrito con el mismo tamaño o sin la última línea
+        leída en su lugar), se vuelve a leer desde el principio.
+        """
+        previo = self._leidos.get(ruta)
+        estado = os.stat(ruta)
+        with open(ruta, "rb") as f:
+            reemplaza = previo is not None and self._reemplazado(f, estado, previo)
+            inicio = 0 if previo is None or reemplaza else previo["posicion"]
+            if inicio == 0:
+                self._encabezados.pop(ruta, None)
+            f.seek(inicio)
+            datos = f.read()
+            cabeza = self._cabeza(f)
+
+        # La última línea puede estar a medio escribir: queda para la próxima lectura
+        completo = datos.rfind(b"\n") + 1
+        datos = datos[:completo]
+        if datos:
+            ultima = datos[datos.rfind(b"\n", 0, completo - 1) + 1:]
+        else:
+            ultima = previo["ultima"] if inicio else b""
+        leido = {
+            "posicion": inicio + completo,
+            "inodo": estado.st_ino,
+            "tamano": estado.st_size,
+            "mtime": estado.st_mtime_ns,
+            "cabeza": cabeza,
+            "ultima": ultima,
+        }
+
+        if ruta not in self._encabezados and datos:
+            salto = datos.find(b"\n") + 1
+            self._encabezados[ruta], datos = datos[:salto], datos[salto:]
+        contenido = self._encabezados[ruta] + datos if datos else None
+        return contenido, leido, reemplaza
+
+    def _leer(self, ruta):
+        """(filas nuevas normalizadas o None, posición o firma leída, reemplaza_archivo)."""
+        if ingesta.formato_de(ruta) == "csv":
+            contenido, leido, reemplaza = self._nuevas_csv(ruta)
+        else:
+            estado = os.stat(ruta)
+            leido = (estado.st_size, estado.st_mtime_ns)
+            contenido = None
+            if self._leidos.get(ruta) != leido:
+                with open(ruta, "rb") as f:
+                    contenido = f.read()
+            reemplaza = contenido is not None
+        if contenido is None:
+            return None, leido, reemplaza
+        return ingesta.normalizar(ingesta.leer(contenido, os.path.basename(ruta))), leido, reemplaza
+
+    def actualizar(self):
+        """Procesa lo nuevo desde la última llamada; devuelve la cantidad de filas nuevas."""
+        with self._candado:
+            nuevas, reemplazos, deltas = 0, False, []
+            archivos = self._archivos()
+            # Un archivo borrado deja de aportar al acumulado
+            for ruta in set(self._leidos) - set(archivos):
+                del self._leidos[ruta]
+                self._encabezados.pop(ruta, None)
+                reemplazos = self._cubos.pop(ruta, None) is not None or reemplazos
+            for ruta in set(self.errores) - set(archivos):
+                del self.errores[ruta]
+
+            for ruta in archivos:
+                try:
+                    df, leido, reemplaza = self._leer(ruta)
+                except Exception as e:
+                    # Un archivo a medio copiar falla al leerse: no se marca como leído y se
+                    # reintenta en la próxima vuelta
+                    self.errores[ruta] = str(e)
+                    continue
+                self.errores.pop(ruta, None)
+                self._leidos[ruta] = leido
+                if reemplaza:
+                    # Lo que aportaba antes el archivo se descarta y el acumulado se rearma
+                    previo = self._cubos.pop(ruta, None)
+                    reemplazos = reemplazos or previo is not None
+                if df is None or df.empty:
+                    continue
+
+                cubo = calculos.construir_cubo(df)
+                if ruta not in self._cubos:
+                    self._cubos[ruta] = cubo
+                else:
+                    self._cubos[ruta] = calculos.sumar_cubos([self._cubos[ruta], cubo])
+                deltas.append(cubo)
+                nuevas += len(df)
+
+            if reemplazos or (self.cubo is None and self._cubos):
+                self.cubo = calculos.sumar_cubos(list(self._cubos.values())) if self._cubos else None
+            elif deltas:
+                self.cubo = calculos.sumar_cubos([self.cubo, *deltas])
+            if nuevas or reemplazos:
+                self.version += 1
+            self.actualizado = datetime.now()
+            return nuevas
+
+    def estado(self):
+        """(cubo, versión) leídos juntos, sin mezclar con una actualización en curso."""
+        with self._candado:
+            return self.cubo, self.version
+
+    def registros(self):
+        return 0 if self.cubo is None else int(self.cubo["Registros"].sum())